@@ -1,7 +1,6 @@
 import psycopg2
 from psycopg2.extras import RealDictCursor
 import hashlib
-import json
 import os
 from datetime import datetime
 
@@ -20,9 +19,8 @@ class DatabaseManager:
                 "No se encontró DATABASE_URL. "
             )
         
-        if self.database_url.startswith('postgresql://'):
-            self.database_url = self.database_url.replace('postgresql://', 'postgres://', 1)
-        
+        # libpq acepta tanto postgresql:// como postgres://: la URL se
+        # usa tal cual viene del entorno
         self.conn = None
     
     def connect(self):
@@ -55,7 +53,7 @@ class DatabaseManager:
             nombre VARCHAR(100) NOT NULL,
             apellido VARCHAR(100) NOT NULL,
             email VARCHAR(255) UNIQUE NOT NULL,
-            password_hash VARCHAR(64) NOT NULL,
+            password_hash VARCHAR(255) NOT NULL,
             carrera VARCHAR(255) DEFAULT 'Ingeniería de Sistemas',
             semestre_actual INTEGER NOT NULL,
             tipo_estudio VARCHAR(20) NOT NULL,
@@ -74,7 +72,7 @@ class DatabaseManager:
             ht INTEGER DEFAULT 0,
             hp INTEGER DEFAULT 0,
             htp INTEGER DEFAULT 0,
-            requisitos JSONB DEFAULT '[]'::jsonb,
+            requisitos TEXT[] DEFAULT '{}',
             creditos_requisitos INTEGER DEFAULT 0
         )
         ''')
@@ -129,6 +127,37 @@ class DatabaseManager:
         cursor.execute('UPDATE tareas SET horas_estimadas = 4 WHERE horas_estimadas IS NULL')
         cursor.execute('UPDATE tareas SET dificultad = 3 WHERE dificultad IS NULL')
         cursor.execute('UPDATE tareas SET porcentaje_completado = 0 WHERE porcentaje_completado IS NULL')
+
+        # Con el backfill hecho, garantizar los defaults a nivel de
+        # esquema: el código que agrega horas/dificultad ya no necesita
+        # defenderse de NULL con "or 0"
+        cursor.execute('ALTER TABLE tareas ALTER COLUMN horas_estimadas SET NOT NULL')
+        cursor.execute('ALTER TABLE tareas ALTER COLUMN dificultad SET NOT NULL')
+        cursor.execute('ALTER TABLE tareas ALTER COLUMN porcentaje_completado SET NOT NULL')
+
+        # Los hashes scrypt superan los 64 caracteres del esquema original
+        cursor.execute('ALTER TABLE usuarios ALTER COLUMN password_hash TYPE VARCHAR(255)')
+
+        # Migrar requisitos de JSONB a TEXT[] en bases existentes:
+        # psycopg2 devuelve text[] como lista sin decodificar JSON y el
+        # motor puede evaluar contención (<@) con índice
+        cursor.execute('''
+        SELECT data_type FROM information_schema.columns
+        WHERE table_name = 'cursos' AND column_name = 'requisitos'
+        ''')
+        tipo_requisitos = cursor.fetchone()
+        if tipo_requisitos and tipo_requisitos['data_type'] == 'jsonb':
+            # ALTER COLUMN ... TYPE no admite subconsultas en USING, así
+            # que la conversión va en tres pasos: columna nueva, backfill
+            # con UPDATE (ahí sí se puede desarmar el JSONB) y swap
+            cursor.execute('ALTER TABLE cursos ADD COLUMN requisitos_arr TEXT[]')
+            cursor.execute('''
+            UPDATE cursos
+            SET requisitos_arr = ARRAY(SELECT jsonb_array_elements_text(requisitos))
+            ''')
+            cursor.execute('ALTER TABLE cursos DROP COLUMN requisitos')
+            cursor.execute('ALTER TABLE cursos RENAME COLUMN requisitos_arr TO requisitos')
+            cursor.execute("ALTER TABLE cursos ALTER COLUMN requisitos SET DEFAULT '{}'")
         
         # Tabla calendario_institucional
         cursor.execute('''
@@ -149,8 +178,57 @@ class DatabaseManager:
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_tareas_fecha ON tareas(fecha_limite)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_historial_usuario ON historial_academico(usuario_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_materias_usuario ON materias_actuales(usuario_id)')
-        
+        # Índice compuesto para el camino de estadísticas/urgentes:
+        # filtra por usuario + completada y ordena/compara por fecha_limite
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_tareas_user_pendientes
+        ON tareas(usuario_id, completada, fecha_limite)
+        ''')
+        # Índice parcial que cubre las agregaciones de distribución
+        # (GROUP BY curso_codigo/tipo sobre tareas pendientes)
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_tareas_user_curso_tipo
+        ON tareas(usuario_id, curso_codigo, tipo)
+        WHERE completada = FALSE
+        ''')
+        # Para obtener_por_semestre/obtener_proximos del calendario
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_calendario_semestre_fecha
+        ON calendario_institucional(semestre, fecha_inicio)
+        ''')
+        # Índices parciales sobre los filtros de estado que usan casi
+        # todas las consultas por usuario
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_historial_usuario_aprobado
+        ON historial_academico(usuario_id, curso_codigo)
+        WHERE estado = 'aprobado'
+        ''')
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_materias_usuario_activo
+        ON materias_actuales(usuario_id, curso_codigo)
+        WHERE estado = 'activo'
+        ''')
+        # Para obtener_proximos (rango sobre fecha_inicio sin semestre)
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_calendario_fecha
+        ON calendario_institucional(fecha_inicio)
+        ''')
+
         self.conn.commit()
+
+        # Índice trigram para las búsquedas ILIKE '%...%' de Curso.buscar.
+        # La extensión puede no estar permitida en todos los entornos
+        # administrados, por eso va aparte y tolera el fallo
+        try:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_cursos_trgm
+            ON cursos USING gin(nombre gin_trgm_ops, codigo gin_trgm_ops)
+            ''')
+            self.conn.commit()
+        except psycopg2.Error:
+            self.conn.rollback()
+            print("Aviso: pg_trgm no disponible, idx_cursos_trgm omitido")
         print("Tablas creadas exitosamente")
     
     def insertar_pensum_sistemas(self):
@@ -255,7 +333,7 @@ class DatabaseManager:
                     materia.get("ht", 0),
                     materia.get("hp", 0),
                     materia.get("htp", 0),
-                    json.dumps(materia.get("requisitos", [])),
+                    materia.get("requisitos", []),
                     materia.get("creditos_requisitos", 0)
                 ))
                 insertadas += 1
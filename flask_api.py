@@ -1,13 +1,25 @@
-from flask import Flask, request, jsonify
+from flask import Flask, g, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
+import heapq
+import json
+import logging
+import time
 from datetime import datetime, timedelta
 import jwt
 import os
 from functools import wraps
+from importlib.util import find_spec
+from itertools import islice
 from typing import Optional, Dict, Any
 
 # Importar modelos
-from poo_models_postgres import Usuario, Curso, Tarea, CalendarioInstitucional
+from poo_models_postgres import (
+    DatabaseModel,
+    Usuario,
+    Curso,
+    Tarea,
+    CalendarioInstitucional
+)
 
 # Intentar importar módulos opcionales (no críticos)
 try:
@@ -24,29 +36,16 @@ except ImportError:
     LOGGER_AVAILABLE = False
     print("⚠️  Módulo logger.py no disponible, usando print por defecto")
     
-try:
-    from validadores import (
-        validar_datos_registro,
-        validar_datos_tarea,
-        validar_email,
-        validar_password
-    )
-    VALIDATORS_AVAILABLE = True
-except ImportError:
-    VALIDATORS_AVAILABLE = False
+# Para los módulos que solo se usan dentro de handlers basta con saber
+# si existen: find_spec no ejecuta el módulo, así que el arranque no
+# paga el costo de importarlos. El import real ocurre en cada handler
+# (tras la primera vez es solo un lookup en sys.modules).
+VALIDATORS_AVAILABLE = find_spec('validadores') is not None
+if not VALIDATORS_AVAILABLE:
     print("⚠️  Módulo validadores.py no disponible, usando validación básica")
 
-try:
-    from r_funcional import (
-        generar_recomendaciones,
-        calcular_carga_semanal,
-        obtener_tareas_urgentes,
-        calcular_estadisticas_funcionales,
-        generar_plan_estudio
-    )
-    RECOMMENDATIONS_AVAILABLE = True
-except ImportError:
-    RECOMMENDATIONS_AVAILABLE = False
+RECOMMENDATIONS_AVAILABLE = find_spec('r_funcional') is not None
+if not RECOMMENDATIONS_AVAILABLE:
     print("⚠️  Módulo recomendaciones_funcional.py no disponible")
 
 try:
@@ -56,6 +55,12 @@ except ImportError:
     NOTIFICATIONS_AVAILABLE = False
     print("⚠️  Módulo notificaciones.py no disponible")
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Cargar variables de entorno
 from dotenv import load_dotenv
 load_dotenv()
@@ -83,6 +88,31 @@ app = Flask(__name__)
 app.config['SECRET_KEY'] = config.SECRET_KEY
 app.config['JSON_AS_ASCII'] = False
 
+# Usar orjson para parsear/serializar JSON si está instalado
+# (parser en C, varias veces más rápido que el json de la stdlib)
+if ORJSON_AVAILABLE:
+    from flask.json.provider import DefaultJSONProvider
+
+    class OrjsonProvider(DefaultJSONProvider):
+        """Provider de JSON basado en orjson."""
+
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, default=self.default).decode('utf-8')
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+        def response(self, *args, **kwargs):
+            # Construir la respuesta directamente con los bytes de orjson
+            # evita el decode a str + re-encode que haría Flask con dumps()
+            obj = self._prepare_response_obj(args, kwargs)
+            return app.response_class(
+                orjson.dumps(obj, default=self.default),
+                mimetype='application/json',
+            )
+
+    app.json = OrjsonProvider(app)
+
 # Configurar CORS
 CORS(app, resources={
     r"/api/*": {
@@ -97,13 +127,12 @@ if LOGGER_AVAILABLE:
     logger = setup_logger('uniplanner_api', config.LOG_LEVEL)
     logger.info("🚀 Aplicación UniPlanner iniciada")
 else:
-    # Logger dummy si no está disponible
-    class DummyLogger:
-        def info(self, msg): print(f"INFO: {msg}")
-        def warning(self, msg): print(f"WARNING: {msg}")
-        def error(self, msg): print(f"ERROR: {msg}")
-        def debug(self, msg): print(f"DEBUG: {msg}")
-    logger = DummyLogger()
+    # Fallback: logger estándar con NullHandler. A diferencia del viejo
+    # DummyLogger basado en print, no hace syscalls de stdout en el
+    # camino caliente y respeta la configuración estándar de logging si
+    # alguien agrega handlers.
+    logger = logging.getLogger('uniplanner_api')
+    logger.addHandler(logging.NullHandler())
 
 # Inicializar gestor de notificaciones
 if NOTIFICATIONS_AVAILABLE:
@@ -111,9 +140,101 @@ if NOTIFICATIONS_AVAILABLE:
 else:
     gestor_notificaciones = None
 
+# Horas de estudio por tipo (construido una sola vez a partir de config)
+HORAS_POR_TIPO_ESTUDIO = {
+    'intensivo': config.HORAS_ESTUDIO_INTENSIVO,
+    'moderado': config.HORAS_ESTUDIO_MODERADO,
+    'leve': config.HORAS_ESTUDIO_LEVE
+}
+
+# Parte fija de la configuración de estudio que devuelve el perfil
+CONFIG_ESTUDIO_BASE = {
+    'dias_semana': [1, 2, 3, 4, 5],
+    'hora_inicio': '08:00',
+    'hora_fin': '22:00',
+    'descansos': 15
+}
+
+# Catálogo estático de logros: (id, nombre, descripción, emoji,
+# tareas completadas requeridas). El umbral entero reemplaza a los
+# lambdas que se creaban en cada petición.
+LOGROS_DISPONIBLES = (
+    ('primera_tarea', 'Primer Paso', 'Completaste tu primera tarea', '🌟', 1),
+    ('10_tareas', 'Productivo', 'Completaste 10 tareas', '💪', 10),
+    ('50_tareas', 'Imparable', 'Completaste 50 tareas', '🚀', 50),
+)
+
+
+# ========== CONEXIÓN POR PETICIÓN ==========
+
+def get_db():
+    """
+    Devuelve la conexión a base de datos de la petición actual.
+
+    Se abre de forma perezosa en el primer uso y se reutiliza para todas
+    las consultas del handler, evitando abrir/cerrar una conexión por
+    consulta en los endpoints que hacen varias.
+    """
+    if 'db' not in g:
+        g.db = DatabaseModel.get_connection()
+    return g.db
+
+
+@app.teardown_appcontext
+def cerrar_db(exception=None):
+    """Cierra la conexión de la petición al finalizar el contexto."""
+    conn = g.pop('db', None)
+    if conn is not None:
+        conn.close()
+
+
+# ========== CACHÉ POR PETICIÓN ==========
+
+def _cache_peticion() -> dict:
+    """Devuelve el diccionario de memoización de la petición actual."""
+    if '_memo' not in g:
+        g._memo = {}
+    return g._memo
+
+
+def obtener_tareas_cacheadas(usuario, solo_pendientes: bool = False):
+    """usuario.obtener_tareas memoizado dentro de la misma petición."""
+    cache = _cache_peticion()
+    key = ('tareas', usuario.id, solo_pendientes)
+    if key not in cache:
+        cache[key] = usuario.obtener_tareas(solo_pendientes=solo_pendientes)
+    return cache[key]
+
+
+def obtener_estadisticas_cacheadas(usuario):
+    """usuario.obtener_estadisticas memoizado dentro de la misma petición."""
+    cache = _cache_peticion()
+    key = ('estadisticas', usuario.id)
+    if key not in cache:
+        cache[key] = usuario.obtener_estadisticas()
+    return cache[key]
+
+
+def generar_notificaciones_cacheadas(usuario):
+    """Notificaciones del usuario memoizadas dentro de la misma petición."""
+    cache = _cache_peticion()
+    key = ('notificaciones', usuario.id)
+    if key not in cache:
+        cache[key] = gestor_notificaciones.generar_notificaciones_usuario(
+            usuario
+        )
+    return cache[key]
+
 
 # ========== UTILIDADES JWT ==========
 
+# Instancia única de PyJWT con el algoritmo fijado; evita re-resolver el
+# algoritmo y alocar la lista de algoritmos en cada encode/decode
+_JWT = jwt.PyJWT()
+_JWT_ALGORITHMS = (config.JWT_ALGORITHM,)
+_JWT_EXPIRATION_SEGUNDOS = int(config.JWT_EXPIRATION.total_seconds())
+
+
 def generar_token(usuario_id: int) -> str:
     """
     Genera token JWT para autenticación del usuario.
@@ -125,13 +246,16 @@ def generar_token(usuario_id: int) -> str:
         String con el token JWT codificado
     """
     try:
+        # PyJWT acepta enteros epoch para iat/exp, lo que evita crear
+        # objetos datetime y la conversión interna datetime→int
+        ahora = int(time.time())
         payload = {
             'user_id': usuario_id,
-            'exp': datetime.utcnow() + config.JWT_EXPIRATION,
-            'iat': datetime.utcnow()
+            'exp': ahora + _JWT_EXPIRATION_SEGUNDOS,
+            'iat': ahora
         }
         
-        token = jwt.encode(
+        token = _JWT.encode(
             payload,
             app.config['SECRET_KEY'],
             algorithm=config.JWT_ALGORITHM
@@ -141,11 +265,12 @@ def generar_token(usuario_id: int) -> str:
         if isinstance(token, bytes):
             token = token.decode('utf-8')
         
-        logger.debug(f"Token generado para usuario {usuario_id}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Token generado para usuario %s", usuario_id)
         return token
         
     except Exception as e:
-        logger.error(f"Error generando token: {e}")
+        logger.error("Error generando token: %s", e)
         raise
 
 
@@ -155,6 +280,11 @@ def token_requerido(f):
     """
     @wraps(f)
     def decorador(*args, **kwargs):
+        # Los preflights CORS no traen Authorization: responderlos aquí
+        # evita pagar el decode JWT y los warnings de "acceso sin token"
+        if request.method == 'OPTIONS':
+            return '', 204
+
         token = request.headers.get('Authorization')
         
         if not token:
@@ -166,29 +296,31 @@ def token_requerido(f):
         
         try:
             # Remover prefijo "Bearer " si existe
-            if token.startswith('Bearer '):
-                token = token[7:]
+            token = token.removeprefix('Bearer ')
             
             # Decodificar token
-            data = jwt.decode(
+            data = _JWT.decode(
                 token,
                 app.config['SECRET_KEY'],
-                algorithms=[config.JWT_ALGORITHM]
+                algorithms=_JWT_ALGORITHMS
             )
             
             usuario_id = data['user_id']
             
-            # Obtener usuario de la base de datos
-            usuario = Usuario.obtener_por_id(usuario_id)
+            # Obtener usuario de la base de datos sobre la conexión de
+            # la petición: el handler reutiliza la misma conexión y se
+            # ahorra un handshake por petición autenticada
+            usuario = Usuario.obtener_por_id(usuario_id, conn=get_db())
             if not usuario:
-                logger.warning(f"Usuario {usuario_id} no encontrado para token válido")
+                logger.warning("Usuario %s no encontrado para token válido", usuario_id)
                 return jsonify({
                     'error': 'Usuario no encontrado',
                     'codigo': 'USUARIO_NO_ENCONTRADO'
                 }), 401
             
-            # Log de petición autenticada
-            if LOGGER_AVAILABLE:
+            # Log de petición autenticada (solo si el nivel INFO está
+            # habilitado, para no construir el dict en vano)
+            if LOGGER_AVAILABLE and logger.isEnabledFor(logging.INFO):
                 log_request(logger, {
                     'method': request.method,
                     'path': request.path,
@@ -207,7 +339,7 @@ def token_requerido(f):
             }), 401
             
         except jwt.InvalidTokenError as e:
-            logger.warning(f"Token inválido: {e}")
+            logger.warning("Token inválido: %s", e)
             return jsonify({
                 'error': 'Token inválido',
                 'codigo': 'TOKEN_INVALIDO'
@@ -220,7 +352,7 @@ def token_requerido(f):
                     'path': request.path
                 })
             else:
-                logger.error(f"Error en autenticación: {e}")
+                logger.error("Error en autenticación: %s", e)
             return jsonify({
                 'error': 'Error de autenticación',
                 'codigo': 'ERROR_AUTENTICACION'
@@ -247,7 +379,6 @@ def health_check():
     """Health check endpoint para monitoreo del sistema."""
     try:
         # Intentar conexión a base de datos
-        from poo_models_postgres import DatabaseModel
         conn = DatabaseModel.get_connection()
         conn.close()
         
@@ -266,7 +397,7 @@ def health_check():
         }), 200
         
     except Exception as e:
-        logger.error(f"Health check falló: {e}")
+        logger.error("Health check falló: %s", e)
         return jsonify({
             'status': 'error',
             'mensaje': 'Error de conexión a base de datos'
@@ -279,7 +410,7 @@ def health_check():
 def registro():
     """Registra un nuevo usuario en el sistema."""
     try:
-        data = request.get_json()
+        data = request.get_json(cache=False, silent=True)
         
         if not data:
             return jsonify({
@@ -289,9 +420,10 @@ def registro():
         
         # Validar datos de entrada
         if VALIDATORS_AVAILABLE:
+            from validadores import validar_datos_registro
             es_valido, mensaje_error = validar_datos_registro(data)
             if not es_valido:
-                logger.warning(f"Datos de registro inválidos: {mensaje_error}")
+                logger.warning("Datos de registro inválidos: %s", mensaje_error)
                 return jsonify({
                     'error': mensaje_error,
                     'codigo': 'VALIDACION_FALLIDA'
@@ -322,7 +454,7 @@ def registro():
         # Generar token
         token = generar_token(usuario.id)
         
-        logger.info(f"Usuario registrado: {usuario.email} (ID: {usuario.id})")
+        logger.info("Usuario registrado: %s (ID: %s)", usuario.email, usuario.id)
         
         return jsonify({
             'success': True,
@@ -340,7 +472,7 @@ def registro():
         }), 201
         
     except ValueError as e:
-        logger.warning(f"Error en registro: {str(e)}")
+        logger.warning("Error en registro: %s", e)
         return jsonify({
             'error': str(e),
             'codigo': 'EMAIL_DUPLICADO'
@@ -353,7 +485,7 @@ def registro():
                 'email': data.get('email', 'N/A')
             })
         else:
-            logger.error(f"Error en registro: {e}")
+            logger.error("Error en registro: %s", e)
         return jsonify({
             'error': 'Error interno del servidor',
             'codigo': 'SERVER_ERROR'
@@ -364,7 +496,7 @@ def registro():
 def login():
     """Autentica un usuario y genera token JWT."""
     try:
-        data = request.get_json()
+        data = request.get_json(cache=False, silent=True)
         
         if not data or not data.get('email') or not data.get('password'):
             return jsonify({
@@ -379,7 +511,7 @@ def login():
         )
         
         if not usuario:
-            logger.warning(f"Login fallido para: {data['email']}")
+            logger.warning("Login fallido para: %s", data['email'])
             return jsonify({
                 'error': 'Credenciales incorrectas',
                 'codigo': 'CREDENCIALES_INCORRECTAS'
@@ -388,7 +520,7 @@ def login():
         # Generar token
         token = generar_token(usuario.id)
         
-        logger.info(f"Login exitoso: {usuario.email}")
+        logger.info("Login exitoso: %s", usuario.email)
         
         return jsonify({
             'success': True,
@@ -412,7 +544,7 @@ def login():
                 'email': data.get('email', 'N/A')
             })
         else:
-            logger.error(f"Error en login: {e}")
+            logger.error("Error en login: %s", e)
         return jsonify({
             'error': 'Error interno del servidor',
             'codigo': 'SERVER_ERROR'
@@ -422,7 +554,7 @@ def login():
 def restablecer_contrasena():
     """Solicita restablecer contrasena."""
     try:
-        data = request.get_json()
+        data = request.get_json(cache=False, silent=True)
 
         if not data or not data.get('email'):
             return jsonify({
@@ -433,6 +565,7 @@ def restablecer_contrasena():
         email = data['email'].lower().strip()
 
         if VALIDATORS_AVAILABLE:
+            from validadores import validar_email
             valido, error = validar_email(email)
             if not valido:
                 return jsonify({
@@ -445,7 +578,7 @@ def restablecer_contrasena():
                 'codigo': 'EMAIL_INVALIDO'
             }), 400
 
-        logger.info(f"Solicitud de restablecer para: {email}")
+        logger.info("Solicitud de restablecer para: %s", email)
 
         return jsonify({
             'success': True,
@@ -453,7 +586,7 @@ def restablecer_contrasena():
         }), 200
 
     except Exception as e:
-        logger.error(f"Error restableciendo contrasena: {e}")
+        logger.error("Error restableciendo contrasena: %s", e)
         return jsonify({
             'error': 'Error interno del servidor',
             'codigo': 'SERVER_ERROR'
@@ -483,7 +616,7 @@ def obtener_cursos():
             } for c in cursos]
         })
     except Exception as e:
-        logger.error(f"Error obteniendo cursos: {e}")
+        logger.error("Error obteniendo cursos: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -507,7 +640,7 @@ def obtener_curso(codigo):
             'creditos_requisitos': curso.creditos_requisitos
         })
     except Exception as e:
-        logger.error(f"Error obteniendo curso: {e}")
+        logger.error("Error obteniendo curso: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -532,7 +665,7 @@ def buscar_cursos():
             } for c in cursos]
         })
     except Exception as e:
-        logger.error(f"Error buscando cursos: {e}")
+        logger.error("Error buscando cursos: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -543,22 +676,13 @@ def buscar_cursos():
 def obtener_perfil(usuario):
     """Obtiene el perfil completo del usuario autenticado."""
     try:
-        stats = usuario.obtener_estadisticas()
-        
+        stats = obtener_estadisticas_cacheadas(usuario)
+
         # Configuración de estudio
-        horas_dict = {
-            'intensivo': config.HORAS_ESTUDIO_INTENSIVO,
-            'moderado': config.HORAS_ESTUDIO_MODERADO,
-            'leve': config.HORAS_ESTUDIO_LEVE
-        }
-        
         config_estudio = {
             'tipo_estudio': usuario.tipo_estudio,
-            'horas_diarias': horas_dict.get(usuario.tipo_estudio, 4),
-            'dias_semana': [1, 2, 3, 4, 5],
-            'hora_inicio': '08:00',
-            'hora_fin': '22:00',
-            'descansos': 15
+            'horas_diarias': HORAS_POR_TIPO_ESTUDIO.get(usuario.tipo_estudio, 4),
+            **CONFIG_ESTUDIO_BASE
         }
         
         return jsonify({
@@ -583,7 +707,7 @@ def obtener_perfil(usuario):
                 'usuario_id': usuario.id
             })
         else:
-            logger.error(f"Error en perfil: {e}")
+            logger.error("Error en perfil: %s", e)
         return jsonify({
             'error': 'Error obteniendo perfil',
             'codigo': 'PERFIL_ERROR'
@@ -606,7 +730,7 @@ def obtener_materias_actuales(usuario):
             } for m in materias]
         })
     except Exception as e:
-        logger.error(f"Error obteniendo materias actuales: {e}")
+        logger.error("Error obteniendo materias actuales: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -626,7 +750,7 @@ def obtener_materias_aprobadas(usuario):
             } for m in materias]
         })
     except Exception as e:
-        logger.error(f"Error obteniendo materias aprobadas: {e}")
+        logger.error("Error obteniendo materias aprobadas: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -635,18 +759,18 @@ def obtener_materias_aprobadas(usuario):
 def inscribir_materia(usuario):
     """POST /api/usuario/materias/inscribir"""
     try:
-        data = request.get_json()
-        codigo = data.get('codigo_materia')
-        
+        data = request.get_json(cache=False, silent=True)
+        codigo = data.get('codigo_materia') if data else None
+
         if not codigo:
             return jsonify({'error': 'codigo_materia requerido'}), 400
-        
-        usuario.inscribir_materia(codigo)
+
+        usuario.inscribir_materia(codigo, conn=get_db())
         return jsonify({'success': True, 'mensaje': 'Materia inscrita'}), 200
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
-        logger.error(f"Error inscribiendo materia: {e}")
+        logger.error("Error inscribiendo materia: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -655,18 +779,18 @@ def inscribir_materia(usuario):
 def cancelar_materia(usuario):
     """POST /api/usuario/materias/cancelar"""
     try:
-        data = request.get_json()
-        codigo = data.get('codigo_materia')
-        
+        data = request.get_json(cache=False, silent=True)
+        codigo = data.get('codigo_materia') if data else None
+
         if not codigo:
             return jsonify({'error': 'codigo_materia requerido'}), 400
-        
-        if usuario.cancelar_materia(codigo):
+
+        if usuario.cancelar_materia(codigo, conn=get_db()):
             return jsonify({'success': True, 'mensaje': 'Materia cancelada'}), 200
         else:
             return jsonify({'error': 'No se pudo cancelar la materia'}), 400
     except Exception as e:
-        logger.error(f"Error cancelando materia: {e}")
+        logger.error("Error cancelando materia: %s", e)
         return jsonify({'error': str(e)}), 500
 
 # ========== ENDPOINTS DE TAREAS ==========
@@ -677,32 +801,43 @@ def obtener_tareas(usuario):
     """GET /api/tareas?pendientes=true"""
     try:
         solo_pendientes = request.args.get('pendientes', 'false').lower() == 'true'
-        
-        tareas = usuario.obtener_tareas(solo_pendientes=solo_pendientes)
-        
-        return jsonify({
-            'tareas': [{
-                'id': t.id,
-                'titulo': t.titulo,
-                'descripcion': t.descripcion,
-                'tipo': t.tipo,
-                'curso': {
-                    'codigo': t.curso.codigo,
-                    'nombre': t.curso.nombre,
-                    'creditos': t.curso.creditos
-                },
-                'fecha_limite': t.fecha_limite.isoformat(),
-                'hora_limite': '23:59',
-                'horas_estimadas': t.horas_estimadas,
-                'dificultad': t.dificultad,
-                'prioridad': t.prioridad,
-                'completada': t.completada,
-                'porcentaje_completado': t.porcentaje_completado,
-                'dias_restantes': t.dias_restantes()
-            } for t in tareas]
-        })
+
+        tareas = obtener_tareas_cacheadas(usuario, solo_pendientes=solo_pendientes)
+
+        def generar_json():
+            """Serializa las tareas de forma incremental para no
+            construir el payload completo en memoria."""
+            yield '{"tareas": ['
+            for i, t in enumerate(tareas):
+                if i:
+                    yield ', '
+                yield json.dumps({
+                    'id': t.id,
+                    'titulo': t.titulo,
+                    'descripcion': t.descripcion,
+                    'tipo': t.tipo,
+                    'curso': {
+                        'codigo': t.curso.codigo,
+                        'nombre': t.curso.nombre,
+                        'creditos': t.curso.creditos
+                    },
+                    'fecha_limite': t.fecha_limite.isoformat(),
+                    'hora_limite': '23:59',
+                    'horas_estimadas': t.horas_estimadas,
+                    'dificultad': t.dificultad,
+                    'prioridad': t.prioridad,
+                    'completada': t.completada,
+                    'porcentaje_completado': t.porcentaje_completado,
+                    'dias_restantes': t.dias_restantes()
+                }, ensure_ascii=False)
+            yield ']}'
+
+        return Response(
+            stream_with_context(generar_json()),
+            mimetype='application/json'
+        )
     except Exception as e:
-        logger.error(f"Error obteniendo tareas: {e}")
+        logger.error("Error obteniendo tareas: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -711,10 +846,14 @@ def obtener_tareas(usuario):
 def crear_tarea(usuario):
     """POST /api/tareas"""
     try:
-        data = request.get_json()
-        
+        data = request.get_json(cache=False, silent=True)
+
+        if not data:
+            return jsonify({'error': 'No se recibieron datos'}), 400
+
         # Validar datos si el validador está disponible
         if VALIDATORS_AVAILABLE:
+            from validadores import validar_datos_tarea
             es_valido, mensaje_error = validar_datos_tarea(data)
             if not es_valido:
                 return jsonify({'error': mensaje_error}), 400
@@ -761,7 +900,7 @@ def crear_tarea(usuario):
         }), 201
         
     except Exception as e:
-        logger.error(f"Error creando tarea: {e}")
+        logger.error("Error creando tarea: %s", e)
         return jsonify({'error': str(e)}), 400
 
 
@@ -770,15 +909,16 @@ def crear_tarea(usuario):
 def eliminar_tarea(usuario, tarea_id):
     """DELETE /api/tareas/{id}"""
     try:
-        tarea = Tarea.obtener_por_id(tarea_id)
-        
+        conn = get_db()
+        tarea = Tarea.obtener_por_id(tarea_id, conn=conn)
+
         if not tarea or tarea.usuario_id != usuario.id:
             return jsonify({'error': 'Tarea no encontrada'}), 404
-        
-        tarea.eliminar()
+
+        tarea.eliminar(conn=conn)
         return jsonify({'success': True, 'mensaje': 'Tarea eliminada'}), 200
     except Exception as e:
-        logger.error(f"Error eliminando tarea: {e}")
+        logger.error("Error eliminando tarea: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -787,15 +927,16 @@ def eliminar_tarea(usuario, tarea_id):
 def completar_tarea(usuario, tarea_id):
     """POST /api/tareas/{id}/completar"""
     try:
-        tarea = Tarea.obtener_por_id(tarea_id)
-        
+        conn = get_db()
+        tarea = Tarea.obtener_por_id(tarea_id, conn=conn)
+
         if not tarea or tarea.usuario_id != usuario.id:
             return jsonify({'error': 'Tarea no encontrada'}), 404
-        
-        tarea.marcar_completada()
+
+        tarea.marcar_completada(conn=conn)
         return jsonify({'success': True, 'mensaje': 'Tarea completada'}), 200
     except Exception as e:
-        logger.error(f"Error completando tarea: {e}")
+        logger.error("Error completando tarea: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -804,21 +945,22 @@ def completar_tarea(usuario, tarea_id):
 def actualizar_progreso(usuario, tarea_id):
     """POST /api/tareas/{id}/progreso"""
     try:
-        tarea = Tarea.obtener_por_id(tarea_id)
-        
+        conn = get_db()
+        tarea = Tarea.obtener_por_id(tarea_id, conn=conn)
+
         if not tarea or tarea.usuario_id != usuario.id:
             return jsonify({'error': 'Tarea no encontrada'}), 404
-        
-        data = request.get_json()
-        porcentaje = data.get('porcentaje')
-        
+
+        data = request.get_json(cache=False, silent=True)
+        porcentaje = data.get('porcentaje') if data else None
+
         if porcentaje is None:
             return jsonify({'error': 'porcentaje requerido'}), 400
-        
-        tarea.actualizar_progreso(int(porcentaje))
+
+        tarea.actualizar_progreso(int(porcentaje), conn=conn)
         return jsonify({'success': True}), 200
     except Exception as e:
-        logger.error(f"Error actualizando progreso: {e}")
+        logger.error("Error actualizando progreso: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -831,10 +973,11 @@ def obtener_recomendaciones(usuario):
     try:
         limite = request.args.get('limite', 5, type=int)
         
-        tareas = usuario.obtener_tareas(solo_pendientes=True)
+        tareas = obtener_tareas_cacheadas(usuario, solo_pendientes=True)
         
         # Si está disponible el módulo de recomendaciones, usarlo
         if RECOMMENDATIONS_AVAILABLE:
+            from r_funcional import generar_recomendaciones
             tareas_recomendadas = generar_recomendaciones(tareas, limite=limite)
         else:
             # Fallback: ordenar por fecha
@@ -852,7 +995,7 @@ def obtener_recomendaciones(usuario):
             } for t in tareas_recomendadas]
         })
     except Exception as e:
-        logger.error(f"Error obteniendo recomendaciones: {e}")
+        logger.error("Error obteniendo recomendaciones: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -863,12 +1006,16 @@ def obtener_urgentes(usuario):
     try:
         dias = request.args.get('dias', 3, type=int)
         
-        tareas = usuario.obtener_tareas(solo_pendientes=True)
+        tareas = obtener_tareas_cacheadas(usuario, solo_pendientes=True)
         
         if RECOMMENDATIONS_AVAILABLE:
+            from r_funcional import obtener_tareas_urgentes
             urgentes = obtener_tareas_urgentes(tareas, dias_umbral=dias)
         else:
-            urgentes = [t for t in tareas if t.dias_restantes() <= dias]
+            # Calcular el umbral una sola vez en lugar de llamar
+            # dias_restantes() (y datetime.now()) por cada tarea
+            fecha_umbral = datetime.now() + timedelta(days=dias)
+            urgentes = [t for t in tareas if t.fecha_limite <= fecha_umbral]
         
         return jsonify({
             'tareas_urgentes': [{
@@ -880,7 +1027,7 @@ def obtener_urgentes(usuario):
             } for t in urgentes]
         })
     except Exception as e:
-        logger.error(f"Error obteniendo urgentes: {e}")
+        logger.error("Error obteniendo urgentes: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -889,12 +1036,12 @@ def obtener_urgentes(usuario):
 def obtener_estadisticas(usuario):
     """GET /api/estadisticas"""
     try:
-        stats = usuario.obtener_estadisticas()
+        stats = obtener_estadisticas_cacheadas(usuario)
         stats['horas_pendientes'] = stats['pendientes'] * 4
         
         return jsonify({'estadisticas': stats})
     except Exception as e:
-        logger.error(f"Error obteniendo estadísticas: {e}")
+        logger.error("Error obteniendo estadísticas: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -903,88 +1050,35 @@ def obtener_estadisticas(usuario):
 def obtener_estadisticas_detalladas(usuario):
     """GET /api/estadisticas/detalladas"""
     try:
-        tareas = usuario.obtener_tareas()
-        tareas_pendientes = [t for t in tareas if not t.completada]
-
-        if RECOMMENDATIONS_AVAILABLE:
-            stats_funcionales = calcular_estadisticas_funcionales(tareas)
-        else:
-            total_tareas = len(tareas)
-            completadas = len([t for t in tareas if t.completada])
-            pendientes = total_tareas - completadas
-            horas_pendientes = sum(
-                (getattr(t, 'horas_estimadas', 0) or 0)
-                for t in tareas_pendientes
-            )
-            if pendientes:
-                dificultad_promedio = sum(
-                    (getattr(t, 'dificultad', 0) or 0)
-                    for t in tareas_pendientes
-                ) / pendientes
-            else:
-                dificultad_promedio = 0
-
-            stats_funcionales = {
-                'total_tareas': total_tareas,
-                'completadas': completadas,
-                'pendientes': pendientes,
-                'horas_pendientes': round(horas_pendientes, 1),
-                'dificultad_promedio': round(dificultad_promedio, 2)
-            }
-
-        total_tareas = stats_funcionales.get('total_tareas', len(tareas))
-        completadas = stats_funcionales.get('completadas', 0)
-        pendientes = stats_funcionales.get('pendientes', 0)
-        horas_pendientes = stats_funcionales.get('horas_pendientes', 0)
-        dificultad_promedio = stats_funcionales.get('dificultad_promedio', 0)
+        # Las reducciones se ejecutan en SQL (agregados + GROUP BY);
+        # en Python solo queda el armado de la respuesta
+        resumen = usuario.obtener_resumen_tareas(conn=get_db())
+
+        total_tareas = resumen['total_tareas']
+        completadas = resumen['completadas']
+        pendientes = resumen['pendientes']
+        horas_pendientes = resumen['horas_pendientes']
+        dificultad_promedio = resumen['dificultad_promedio']
+        distribucion_materia = resumen['distribucion_materia']
+        distribucion_tipo = resumen['distribucion_tipo']
+        materias_criticas = resumen['materias_criticas']
 
         tasa_completado = round(
             (completadas / total_tareas) * 100, 1
         ) if total_tareas else 0
         racha_dias = min(completadas, 7) if completadas else 0
 
-        distribucion_materia = {}
-        distribucion_tipo = {}
-        for tarea in tareas_pendientes:
-            materia = (
-                tarea.curso.nombre
-                if tarea.curso
-                else (tarea.curso_codigo or 'Sin curso')
-            )
-            horas = getattr(tarea, 'horas_estimadas', 0) or 0
-            distribucion_materia[materia] = round(
-                distribucion_materia.get(materia, 0) + horas, 1
-            )
-
-            tipo = tarea.tipo or 'General'
-            distribucion_tipo[tipo] = round(
-                distribucion_tipo.get(tipo, 0) + horas, 1
-            )
-
-        materias_criticas = []
-        for tarea in tareas_pendientes:
-            try:
-                if tarea.dias_restantes() <= 2:
-                    materia = (
-                        tarea.curso.nombre
-                        if tarea.curso
-                        else (tarea.curso_codigo or 'Sin curso')
-                    )
-                    if materia not in materias_criticas:
-                        materias_criticas.append(materia)
-            except Exception:
-                continue
-
         if not materias_criticas and distribucion_materia:
+            # Top-3 con heap en lugar de ordenar toda la distribución
             materias_criticas = [
-                materia for materia, _ in sorted(
+                materia for materia, _ in heapq.nlargest(
+                    3,
                     distribucion_materia.items(),
-                    key=lambda x: x[1],
-                    reverse=True
-                )[:3]
+                    key=lambda x: x[1]
+                )
             ]
 
-        stats_usuario = usuario.obtener_estadisticas()
+        stats_usuario = obtener_estadisticas_cacheadas(usuario)
         creditos_aprobados = stats_usuario.get('creditos_aprobados', 0)
         creditos_actuales = stats_usuario.get('creditos_actuales', 0)
         total_creditos = 162
@@ -1013,45 +1107,91 @@ def obtener_estadisticas_detalladas(usuario):
             }
         }), 200
     except Exception as e:
-        logger.error(f"Error obteniendo estadisticas detalladas: {e}")
+        logger.error("Error obteniendo estadisticas detalladas: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
 # ========== ENDPOINTS DE CALENDARIO (CORREGIDO) ==========
 
+# El calendario institucional cambia a ritmo de semestre: se cachea la
+# lista ya serializada por unos minutos para que las peticiones
+# repetidas no paguen consulta, instanciación de objetos ni isoformat
+CALENDARIO_CACHE_TTL = 300  # segundos
+_CALENDARIO_CACHE_MAX = 64  # claves distintas antes de vaciar
+_calendario_cache: Dict[str, tuple] = {}
+
+
 @app.route('/api/calendario/eventos', methods=['GET'])
 def obtener_eventos_calendario():
     """GET /api/calendario/eventos?semestre=2025-1"""
     try:
         semestre = request.args.get('semestre')
-        
+
+        clave = semestre or '__proximos_90__'
+        ahora = time.time()
+        cacheado = _calendario_cache.get(clave)
+        if cacheado and ahora - cacheado[0] < CALENDARIO_CACHE_TTL:
+            return jsonify({'eventos': cacheado[1]})
+
         if semestre:
             eventos = CalendarioInstitucional.obtener_por_semestre(semestre)
         else:
             eventos = CalendarioInstitucional.obtener_proximos(dias=90)
-        
-        return jsonify({
-            'eventos': [{
-                'id': e.id,
-                'nombre_evento': e.nombre_evento,
-                'descripcion': e.descripcion if hasattr(e, 'descripcion') else '',
-                'fecha_inicio': e.fecha_inicio.isoformat() if hasattr(e.fecha_inicio, 'isoformat') else str(e.fecha_inicio),
-                'fecha_fin': e.fecha_fin.isoformat() if e.fecha_fin and hasattr(e.fecha_fin, 'isoformat') else (str(e.fecha_fin) if e.fecha_fin else None),
-                'tipo': e.tipo,
-                'semestre': e.semestre,
-                'icono': e.icono if hasattr(e, 'icono') else '📅',
-                'color': e.color
-            } for e in eventos]
-        })
+
+        eventos_serializados = [{
+            'id': e.id,
+            'nombre_evento': e.nombre_evento,
+            'descripcion': getattr(e, 'descripcion', ''),
+            'fecha_inicio': e.fecha_inicio.isoformat() if hasattr(e.fecha_inicio, 'isoformat') else str(e.fecha_inicio),
+            'fecha_fin': e.fecha_fin.isoformat() if e.fecha_fin and hasattr(e.fecha_fin, 'isoformat') else (str(e.fecha_fin) if e.fecha_fin else None),
+            'tipo': e.tipo,
+            'semestre': e.semestre,
+            'icono': getattr(e, 'icono', '📅'),
+            'color': e.color
+        } for e in eventos]
+
+        # Cota simple de tamaño (mismo guardián que el caché de
+        # notificaciones): la clave sale del query string del cliente y
+        # sin tope valores distintos crecerían el dict sin límite
+        if len(_calendario_cache) >= _CALENDARIO_CACHE_MAX:
+            _calendario_cache.clear()
+        _calendario_cache[clave] = (ahora, eventos_serializados)
+
+        return jsonify({'eventos': eventos_serializados})
     except Exception as e:
-        logger.error(f"Error obteniendo eventos calendario: {e}")
-        import traceback
-        traceback.print_exc()
+        # exception() adjunta el stack via exc_info; no hace falta
+        # importar traceback en la ruta de error
+        logger.exception("Error obteniendo eventos calendario: %s", e)
         return jsonify({'error': f'Error obteniendo calendario: {str(e)}'}), 500
 
 
 # ========== ENDPOINTS AVANZADOS (con fallback si módulos no disponibles) ==========
 
+def _formatear_tareas_plan(tareas):
+    """
+    Serializa las tareas de un día del plan de estudio.
+
+    Liga los atributos a locales una sola vez por tarea para reducir los
+    lookups repetidos (t.curso.codigo, t.curso.nombre, ...) dentro del
+    bucle de armado del JSON.
+    """
+    resultado = []
+    for t in tareas:
+        curso = t.curso
+        resultado.append({
+            'id': t.id,
+            'titulo': t.titulo,
+            'curso': {
+                'codigo': curso.codigo,
+                'nombre': curso.nombre
+            },
+            'horas_estimadas': t.horas_estimadas,
+            'dificultad': t.dificultad,
+            'fecha_limite': t.fecha_limite.isoformat()
+        })
+    return resultado
+
+
 @app.route('/api/recomendaciones/plan-estudio', methods=['GET'])
 @token_requerido
 def obtener_plan_estudio(usuario):
@@ -1063,40 +1203,24 @@ def obtener_plan_estudio(usuario):
                 'codigo': 'MODULE_NOT_AVAILABLE'
             }), 503
         
-        horas_dict = {
-            'intensivo': config.HORAS_ESTUDIO_INTENSIVO,
-            'moderado': config.HORAS_ESTUDIO_MODERADO,
-            'leve': config.HORAS_ESTUDIO_LEVE
-        }
-        
         horas_diarias = request.args.get(
             'horas_diarias',
-            horas_dict.get(usuario.tipo_estudio, 4),
+            HORAS_POR_TIPO_ESTUDIO.get(usuario.tipo_estudio, 4),
             type=float
         )
         
         dias = request.args.get('dias', 7, type=int)
-        tareas = usuario.obtener_tareas(solo_pendientes=True)
+        tareas = obtener_tareas_cacheadas(usuario, solo_pendientes=True)
+
+        from r_funcional import generar_plan_estudio
         plan = generar_plan_estudio(tareas, horas_diarias)
         plan = plan[:dias]
         
-        plan_formateado = []
-        for dia in plan:
-            plan_formateado.append({
-                'fecha': dia['fecha'].isoformat(),
-                'tareas': [{
-                    'id': t.id,
-                    'titulo': t.titulo,
-                    'curso': {
-                        'codigo': t.curso.codigo,
-                        'nombre': t.curso.nombre
-                    },
-                    'horas_estimadas': t.horas_estimadas,
-                    'dificultad': t.dificultad,
-                    'fecha_limite': t.fecha_limite.isoformat()
-                } for t in dia['tareas']],
-                'horas_totales': dia['horas_totales']
-            })
+        plan_formateado = [{
+            'fecha': dia['fecha'].isoformat(),
+            'tareas': _formatear_tareas_plan(dia['tareas']),
+            'horas_totales': dia['horas_totales']
+        } for dia in plan]
         
         return jsonify({
             'plan_estudio': plan_formateado,
@@ -1112,7 +1236,7 @@ def obtener_plan_estudio(usuario):
                 'usuario_id': usuario.id
             })
         else:
-            logger.error(f"Error generando plan: {e}")
+            logger.error("Error generando plan: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -1127,10 +1251,18 @@ def obtener_carga_semanal(usuario):
                 'codigo': 'MODULE_NOT_AVAILABLE'
             }), 503
         
-        tareas = usuario.obtener_tareas(solo_pendientes=True)
+        tareas = obtener_tareas_cacheadas(usuario, solo_pendientes=True)
+
+        from r_funcional import calcular_carga_semanal
         carga = calcular_carga_semanal(tareas)
-        total_horas = sum(carga.values())
-        materias_criticas = [m for m, h in carga.items() if h > 10]
+
+        # Total y materias críticas en una sola pasada sobre la carga
+        total_horas = 0.0
+        materias_criticas = []
+        for materia, horas in carga.items():
+            total_horas += horas
+            if horas > 10:
+                materias_criticas.append(materia)
         
         return jsonify({
             'carga_por_materia': carga,
@@ -1144,7 +1276,7 @@ def obtener_carga_semanal(usuario):
         }), 200
         
     except Exception as e:
-        logger.error(f"Error calculando carga: {e}")
+        logger.error("Error calculando carga: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -1161,14 +1293,19 @@ def obtener_notificaciones(usuario):
             }), 200
         
         solo_no_leidas = request.args.get('solo_no_leidas', 'false').lower() == 'true'
-        limite = request.args.get('limite', 20, type=int)
-        
-        notificaciones = gestor_notificaciones.generar_notificaciones_usuario(usuario)
+        # islice no admite negativos (el slice original devolvia lista
+        # recortada): un ?limite= negativo se trata como cero
+        limite = max(request.args.get('limite', 20, type=int), 0)
         
+        notificaciones = generar_notificaciones_cacheadas(usuario)
+
+        # Una sola pasada que se corta en `limite`: no se materializa la
+        # lista filtrada completa para luego recortarla
         if solo_no_leidas:
-            notificaciones = [n for n in notificaciones if not n.leida]
-        
-        notificaciones = notificaciones[:limite]
+            fuente = (n for n in notificaciones if not n.leida)
+        else:
+            fuente = iter(notificaciones)
+        notificaciones = list(islice(fuente, limite))
         
         return jsonify({
             'notificaciones': [n.to_dict() for n in notificaciones],
@@ -1176,7 +1313,7 @@ def obtener_notificaciones(usuario):
         }), 200
         
     except Exception as e:
-        logger.error(f"Error obteniendo notificaciones: {e}")
+        logger.error("Error obteniendo notificaciones: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -1190,7 +1327,7 @@ def marcar_notificacion_leida(usuario, notif_id):
             'id': notif_id
         }), 200
     except Exception as e:
-        logger.error(f"Error marcando notificacion: {e}")
+        logger.error("Error marcando notificacion: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -1205,12 +1342,13 @@ def contar_notificaciones_no_leidas(usuario):
                 'mensaje': 'Modulo de notificaciones no disponible'
             }), 200
 
-        notificaciones = gestor_notificaciones.generar_notificaciones_usuario(usuario)
-        no_leidas = len([n for n in notificaciones if not n.leida])
+        notificaciones = generar_notificaciones_cacheadas(usuario)
+        # Contar sobre el generador evita materializar una lista desechable
+        no_leidas = sum(1 for n in notificaciones if not n.leida)
 
         return jsonify({'no_leidas': no_leidas}), 200
     except Exception as e:
-        logger.error(f"Error contando notificaciones: {e}")
+        logger.error("Error contando notificaciones: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -1219,71 +1357,52 @@ def contar_notificaciones_no_leidas(usuario):
 def obtener_logros(usuario):
     """Obtiene logros desbloqueados y progreso del usuario."""
     try:
-        stats = usuario.obtener_estadisticas()
-        
-        logros_disponibles = [
-            {
-                'id': 'primera_tarea',
-                'nombre': 'Primer Paso',
-                'descripcion': 'Completaste tu primera tarea',
-                'emoji': '🌟',
-                'requisito': lambda s: s['completadas'] >= 1
-            },
-            {
-                'id': '10_tareas',
-                'nombre': 'Productivo',
-                'descripcion': 'Completaste 10 tareas',
-                'emoji': '💪',
-                'requisito': lambda s: s['completadas'] >= 10
-            },
-            {
-                'id': '50_tareas',
-                'nombre': 'Imparable',
-                'descripcion': 'Completaste 50 tareas',
-                'emoji': '🚀',
-                'requisito': lambda s: s['completadas'] >= 50
-            }
-        ]
+        stats = obtener_estadisticas_cacheadas(usuario)
         
+        completadas = stats['completadas']
+        fecha_obtenido = datetime.now().isoformat()
+
         logros_desbloqueados = []
-        for logro in logros_disponibles:
-            if logro['requisito'](stats):
+        for logro_id, nombre, descripcion, emoji, requisito in LOGROS_DISPONIBLES:
+            if completadas >= requisito:
                 logros_desbloqueados.append({
-                    'id': logro['id'],
-                    'nombre': logro['nombre'],
-                    'descripcion': logro['descripcion'],
-                    'emoji': logro['emoji'],
-                    'fecha_obtenido': datetime.now().isoformat()
+                    'id': logro_id,
+                    'nombre': nombre,
+                    'descripcion': descripcion,
+                    'emoji': emoji,
+                    'fecha_obtenido': fecha_obtenido
                 })
         
-        exp_total = stats['completadas'] * 10 + stats['creditos_aprobados'] * 20
-        nivel_actual = exp_total // 100
-        exp_actual = exp_total % 100
+        exp_total = completadas * 10 + stats['creditos_aprobados'] * 20
+        # divmod resuelve nivel y exp restante en una sola operación;
+        # con exp_siguiente fijo en 100, exp_actual ya es el porcentaje
+        nivel_actual, exp_actual = divmod(exp_total, 100)
         exp_siguiente = 100
 
+        n_desbloqueados = len(logros_desbloqueados)
+        n_total = len(LOGROS_DISPONIBLES)
+
         estadisticas_generales = {
-            'tareas_completadas': stats.get('completadas', 0),
+            'tareas_completadas': completadas,
             'creditos_aprobados': stats.get('creditos_aprobados', 0),
             'materias_cursando': stats.get('materias_actuales', 0)
         }
-        
+
         return jsonify({
             'logros_desbloqueados': logros_desbloqueados,
-            'total_logros': len(logros_disponibles),
-            'porcentaje_logros': round(
-                len(logros_desbloqueados) / len(logros_disponibles) * 100, 1
-            ),
+            'total_logros': n_total,
+            'porcentaje_logros': round(n_desbloqueados * 100.0 / n_total, 1),
             'progreso_nivel': {
                 'nivel_actual': nivel_actual,
                 'exp_actual': exp_actual,
                 'exp_siguiente_nivel': exp_siguiente,
-                'porcentaje': round(exp_actual / exp_siguiente * 100, 1)
+                'porcentaje': round(float(exp_actual), 1)
             },
             'estadisticas_generales': estadisticas_generales
         }), 200
         
     except Exception as e:
-        logger.error(f"Error obteniendo logros: {e}")
+        logger.error("Error obteniendo logros: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
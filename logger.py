@@ -30,28 +30,34 @@ class ColoredFormatter(logging.Formatter):
         'CRITICAL': '\033[35m',   # Magenta
         'RESET': '\033[0m'        # Reset
     }
-    
+
+    def __init__(self, *args, **kwargs):
+        """Inicializa el formatter cacheando el chequeo de terminal."""
+        super().__init__(*args, **kwargs)
+        # isatty() implica una syscall; comprobarlo una sola vez aquí
+        # en lugar de por cada registro de log
+        self._use_color = (
+            hasattr(sys.stderr, 'isatty') and sys.stderr.isatty()
+        )
+
     def format(self, record):
         """
         Formatea el registro de log con colores según el nivel.
-        
+
         Args:
             record (logging.LogRecord): Registro de logging a formatear
-            
+
         Returns:
             str: String formateado con colores ANSI si es terminal
         """
-        # Obtener color según nivel de log
-        color = self.COLORS.get(record.levelname, self.COLORS['RESET'])
-        
         # Formatear el mensaje base usando el formatter padre
         log_message = super().format(record)
-        
+
         # Agregar color solo si la salida es un terminal (no archivo)
-        # os.isatty(2) verifica si stderr es un terminal
-        if hasattr(sys.stderr, 'isatty') and sys.stderr.isatty():
+        if self._use_color:
+            color = self.COLORS.get(record.levelname, self.COLORS['RESET'])
             return f"{color}{log_message}{self.COLORS['RESET']}"
-        
+
         return log_message
 
 
@@ -209,14 +215,13 @@ def log_request(logger: logging.Logger, request_data: Dict[str, str]):
     user_id = request_data.get('user_id', 'anonymous')
     ip = request_data.get('ip', 'unknown')
     status = request_data.get('status', '')
-    
-    # Construir mensaje estructurado
-    message = f"REQUEST {method} {path} | User: {user_id} | IP: {ip}"
-    
-    if status:
-        message += f" | Status: {status}"
-    
-    logger.info(message)
+
+    # Formateo diferido: logging solo interpola si el nivel está activo
+    logger.info(
+        "REQUEST %s %s | User: %s | IP: %s%s",
+        method, path, user_id, ip,
+        f" | Status: {status}" if status else ""
+    )
 
 
 def log_error_with_context(
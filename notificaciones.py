@@ -1,7 +1,10 @@
+import time
+from contextlib import contextmanager
+from itertools import islice
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
 class TipoNotificacion(Enum):
@@ -19,21 +22,36 @@ class TipoNotificacion(Enum):
 
 
 class PrioridadNotificacion(Enum):
-    """Niveles de prioridad para notificaciones."""
-    CRITICA = "critica"      # Debe verse inmediatamente
-    ALTA = "alta"            # Importante pero no crítica
-    MEDIA = "media"          # Informativa
-    BAJA = "baja"            # Opcional
+    """
+    Niveles de prioridad para notificaciones.
+
+    Cada miembro lleva su orden numérico incorporado (0 = más urgente),
+    así el sort y los filtros comparan enteros directamente sin pasar
+    por un dict de orden auxiliar. El value sigue siendo el string que
+    expone la API.
+    """
+    CRITICA = ("critica", 0)     # Debe verse inmediatamente
+    ALTA = ("alta", 1)           # Importante pero no crítica
+    MEDIA = ("media", 2)         # Informativa
+    BAJA = ("baja", 3)           # Opcional
+
+    def __new__(cls, valor, orden):
+        obj = object.__new__(cls)
+        obj._value_ = valor
+        obj.orden = orden
+        return obj
 
 
-@dataclass
+@dataclass(slots=True)
 class Notificacion:
     """
     Modelo de datos para notificaciones.
-    
+
     Usa @dataclass para reducir boilerplate code y
     proporcionar métodos __init__, __repr__, etc. automáticamente.
-    
+    Con slots=True las instancias no llevan __dict__: menos memoria por
+    notificación acumulada y acceso a atributos por descriptor.
+
     Attributes:
         id: Identificador único
         tipo: Tipo de notificación (enum)
@@ -54,29 +72,81 @@ class Notificacion:
     fecha_entrega: datetime
     leida: bool = False
     datos_extra: Optional[Dict] = None
-    
+    # Forma serializada memoizada; leida es el único campo mutable y se
+    # actualiza en sitio desde marcar_leida
+    _dict_cache: Optional[Dict] = field(
+        default=None, repr=False, compare=False
+    )
+
     def marcar_leida(self):
         """Marca la notificación como leída."""
         self.leida = True
-    
+        if self._dict_cache is not None:
+            self._dict_cache['leida'] = True
+
     def to_dict(self) -> Dict:
         """
         Convierte la notificación a diccionario para JSON.
-        
+
+        El resultado se memoiza: una notificación que aparece en varios
+        sondeos no repite los isoformat() ni la construcción del dict.
+
         Returns:
             Diccionario con todos los campos serializables
         """
-        return {
-            'id': self.id,
-            'tipo': self.tipo.value,
-            'prioridad': self.prioridad.value,
-            'titulo': self.titulo,
-            'mensaje': self.mensaje,
-            'fecha_creacion': self.fecha_creacion.isoformat(),
-            'fecha_entrega': self.fecha_entrega.isoformat(),
-            'leida': self.leida,
-            'datos_extra': self.datos_extra or {}
-        }
+        if self._dict_cache is None:
+            self._dict_cache = {
+                'id': self.id,
+                'tipo': self.tipo.value,
+                'prioridad': self.prioridad.value,
+                'titulo': self.titulo,
+                'mensaje': self.mensaje,
+                'fecha_creacion': self.fecha_creacion.isoformat(),
+                'fecha_entrega': self.fecha_entrega.isoformat(),
+                'leida': self.leida,
+                'datos_extra': self.datos_extra or {}
+            }
+        return self._dict_cache
+
+
+# Mejor horario de estudio por tipo, pre-parseado a (hora, minuto) para
+# no hacer split(':') + int() en cada recordatorio
+_HORARIOS_ESTUDIO = {
+    'intensivo': (8, 0),
+    'moderado': (14, 0),
+    'leve': (18, 0)
+}
+
+# Configuración estática de logros; construirla por llamada alocaba
+# (y el GC recogía) un dict anidado por notificación de logro
+_LOGROS_CONFIG = {
+    'primera_tarea': {
+        'titulo': '🎉 ¡Primer paso!',
+        'mensaje': '¡Completaste tu primera tarea! Sigue así.',
+        'emoji': '🌟'
+    },
+    'racha_7_dias': {
+        'titulo': '🔥 ¡Racha de 7 días!',
+        'mensaje': 'Has usado UniPlanner 7 días seguidos. ¡Increíble dedicación!',
+        'emoji': '🔥'
+    },
+    '10_tareas_completadas': {
+        'titulo': '💪 ¡Productivo!',
+        'mensaje': '¡Has completado 10 tareas! Tu organización es admirable.',
+        'emoji': '⭐'
+    },
+    'semestre_sin_atrasos': {
+        'titulo': '👑 ¡Maestro del tiempo!',
+        'mensaje': 'No tienes tareas atrasadas este semestre. ¡Eres un ejemplo!',
+        'emoji': '👑'
+    }
+}
+
+_LOGRO_CONFIG_DEFECTO = {
+    'titulo': '🎊 ¡Logro desbloqueado!',
+    'mensaje': 'Has alcanzado un nuevo logro.',
+    'emoji': '🏆'
+}
 
 
 class GeneradorNotificaciones:
@@ -89,17 +159,43 @@ class GeneradorNotificaciones:
     def __init__(self):
         """Inicializa el generador con configuración por defecto."""
         self.contador_ids = 0
-    
+        self._ahora = None
+        # Prefijo de timestamp para los ids; la unicidad la da el
+        # contador, así que basta refrescarlo por lote
+        self._ts_prefix = int(time.time())
+        # fecha_entrega por tipo_estudio dentro del lote activo
+        self._entrega_por_tipo: Dict[str, datetime] = {}
+
+    @contextmanager
+    def batch(self):
+        """
+        Fija un 'ahora' compartido para un lote de notificaciones.
+
+        Dentro del bloque, todos los generar_* reutilizan el mismo
+        datetime en lugar de leer el reloj (una syscall) varias veces
+        por notificación; el alcance del lote acota la frescura.
+        """
+        self._ahora = datetime.now()
+        self._ts_prefix = int(self._ahora.timestamp())
+        self._entrega_por_tipo.clear()
+        try:
+            yield
+        finally:
+            self._ahora = None
+
+    def _now(self) -> datetime:
+        """Devuelve el 'ahora' del lote activo, o lee el reloj."""
+        return self._ahora or datetime.now()
+
     def _generar_id(self) -> str:
         """
         Genera ID único para notificación.
-        
+
         Returns:
             String con formato "notif_TIMESTAMP_CONTADOR"
         """
         self.contador_ids += 1
-        timestamp = int(datetime.now().timestamp())
-        return f"notif_{timestamp}_{self.contador_ids}"
+        return f"notif_{self._ts_prefix}_{self.contador_ids}"
     
     def generar_notificacion_tarea_urgente(
         self,
@@ -146,8 +242,8 @@ class GeneradorNotificaciones:
             prioridad=prioridad,
             titulo=titulo,
             mensaje=mensaje,
-            fecha_creacion=datetime.now(),
-            fecha_entrega=datetime.now(),
+            fecha_creacion=self._now(),
+            fecha_entrega=self._now(),
             datos_extra={
                 'tarea_id': tarea.id,
                 'curso_codigo': tarea.curso_codigo,
@@ -171,7 +267,7 @@ class GeneradorNotificaciones:
         Returns:
             Notificacion configurada
         """
-        dias_hasta = (evento.fecha_inicio - datetime.now().date()).days
+        dias_hasta = (evento.fecha_inicio - self._now().date()).days
         
         if dias_hasta <= 1:
             titulo = f"📅 HOY: {evento.nombre_evento}"
@@ -195,8 +291,8 @@ class GeneradorNotificaciones:
             prioridad=prioridad,
             titulo=titulo,
             mensaje=mensaje,
-            fecha_creacion=datetime.now(),
-            fecha_entrega=datetime.now(),
+            fecha_creacion=self._now(),
+            fecha_entrega=self._now(),
             datos_extra={
                 'evento_id': evento.id,
                 'tipo_evento': evento.tipo,
@@ -219,20 +315,26 @@ class GeneradorNotificaciones:
         Returns:
             Notificacion con sugerencia de estudio
         """
-        # Determinar mejor horario según tipo de estudio
-        horarios = {
-            'intensivo': '08:00',
-            'moderado': '14:00',
-            'leve': '18:00'
-        }
-        horario = horarios.get(usuario.tipo_estudio, '14:00')
+        # Determinar mejor horario según tipo de estudio; dentro de un
+        # lote la fecha de entrega por tipo se construye una sola vez
+        fecha_entrega = self._entrega_por_tipo.get(usuario.tipo_estudio)
+        if fecha_entrega is None:
+            hora, minuto = _HORARIOS_ESTUDIO.get(
+                usuario.tipo_estudio, (14, 0)
+            )
+            fecha_entrega = self._now().replace(hour=hora, minute=minuto)
+            self._entrega_por_tipo[usuario.tipo_estudio] = fecha_entrega
         
         if len(materias_pendientes) == 1:
             titulo = f"📚 Hora de estudiar {materias_pendientes[0].nombre}"
             mensaje = f"Tienes tareas pendientes en {materias_pendientes[0].nombre}. ¡Es buen momento para avanzar!"
         else:
             titulo = f"📚 Tienes {len(materias_pendientes)} materias pendientes"
-            mensaje = f"Materias: {', '.join(m.nombre for m in materias_pendientes[:3])}..."
+            # islice evita alocar la sublista intermedia del [:3]
+            nombres = ', '.join(
+                m.nombre for m in islice(materias_pendientes, 3)
+            )
+            mensaje = f"Materias: {nombres}..."
         
         return Notificacion(
             id=self._generar_id(),
@@ -240,11 +342,8 @@ class GeneradorNotificaciones:
             prioridad=PrioridadNotificacion.MEDIA,
             titulo=titulo,
             mensaje=mensaje,
-            fecha_creacion=datetime.now(),
-            fecha_entrega=datetime.now().replace(
-                hour=int(horario.split(':')[0]),
-                minute=0
-            ),
+            fecha_creacion=self._now(),
+            fecha_entrega=fecha_entrega,
             datos_extra={
                 'usuario_id': usuario.id,
                 'tipo_estudio': usuario.tipo_estudio,
@@ -267,34 +366,7 @@ class GeneradorNotificaciones:
         Returns:
             Notificacion celebratoria
         """
-        logros_config = {
-            'primera_tarea': {
-                'titulo': '🎉 ¡Primer paso!',
-                'mensaje': '¡Completaste tu primera tarea! Sigue así.',
-                'emoji': '🌟'
-            },
-            'racha_7_dias': {
-                'titulo': '🔥 ¡Racha de 7 días!',
-                'mensaje': 'Has usado UniPlanner 7 días seguidos. ¡Increíble dedicación!',
-                'emoji': '🔥'
-            },
-            '10_tareas_completadas': {
-                'titulo': '💪 ¡Productivo!',
-                'mensaje': '¡Has completado 10 tareas! Tu organización es admirable.',
-                'emoji': '⭐'
-            },
-            'semestre_sin_atrasos': {
-                'titulo': '👑 ¡Maestro del tiempo!',
-                'mensaje': 'No tienes tareas atrasadas este semestre. ¡Eres un ejemplo!',
-                'emoji': '👑'
-            }
-        }
-        
-        config = logros_config.get(tipo_logro, {
-            'titulo': '🎊 ¡Logro desbloqueado!',
-            'mensaje': 'Has alcanzado un nuevo logro.',
-            'emoji': '🏆'
-        })
+        config = _LOGROS_CONFIG.get(tipo_logro, _LOGRO_CONFIG_DEFECTO)
         
         return Notificacion(
             id=self._generar_id(),
@@ -302,8 +374,8 @@ class GeneradorNotificaciones:
             prioridad=PrioridadNotificacion.BAJA,
             titulo=config['titulo'],
             mensaje=config['mensaje'],
-            fecha_creacion=datetime.now(),
-            fecha_entrega=datetime.now(),
+            fecha_creacion=self._now(),
+            fecha_entrega=self._now(),
             datos_extra={
                 'tipo_logro': tipo_logro,
                 'emoji': config['emoji'],
@@ -312,17 +384,25 @@ class GeneradorNotificaciones:
         )
 
 
+# TTL y tope del caché por usuario del gestor: el frontend sondea las
+# notificaciones con frecuencia y el resultado es válido por minutos
+_NOTIF_CACHE_TTL = 60       # segundos
+_NOTIF_CACHE_MAX = 1024     # usuarios distintos antes de vaciar
+
+
 class GestorNotificaciones:
     """
     Gestor central de notificaciones del usuario.
-    
+
     Coordina la creación, almacenamiento y entrega de notificaciones.
     """
-    
+
     def __init__(self):
         """Inicializa el gestor."""
         self.generador = GeneradorNotificaciones()
         self.notificaciones_cache = []
+        # {usuario_id: (monotonic, [Notificacion])}
+        self._cache_usuarios: Dict[int, tuple] = {}
     
     def generar_notificaciones_usuario(self, usuario) -> List[Notificacion]:
         """
@@ -346,12 +426,50 @@ class GestorNotificaciones:
             >>> for notif in notificaciones:
             ...     print(notif.titulo)
         """
+        # Caché corto por usuario: los sondeos repetidos del frontend
+        # dentro del TTL no regeneran todo el lote
+        ahora = time.monotonic()
+        entrada = self._cache_usuarios.get(usuario.id)
+        if entrada and ahora - entrada[0] < _NOTIF_CACHE_TTL:
+            return entrada[1]
+
+        # Un solo datetime.now() compartido por todo el lote
+        with self.generador.batch():
+            notificaciones = self._generar_lote(usuario)
+
+        # Cota simple de tamaño para no crecer sin límite
+        if len(self._cache_usuarios) >= _NOTIF_CACHE_MAX:
+            self._cache_usuarios.clear()
+        self._cache_usuarios[usuario.id] = (ahora, notificaciones)
+
+        return notificaciones
+
+    def _generar_lote(self, usuario) -> List[Notificacion]:
+        """Cuerpo de generar_notificaciones_usuario dentro del lote."""
         notificaciones = []
-        
-        # 1. Verificar tareas urgentes
+
+        # 1. Verificar tareas urgentes. La resta se hace inline contra el
+        # 'ahora' del lote: dias_restantes() leería el reloj y pagaría un
+        # despacho de método por cada tarea
+        ahora = self.generador._now()
         tareas = usuario.obtener_tareas(solo_pendientes=True)
+
+        # Camino rápido: sin tareas pendientes solo queda el posible
+        # logro; si tampoco aplica, no hay nada que construir ni ordenar
+        if not tareas:
+            completadas = usuario.contar_tareas_completadas()
+            if completadas == 1:
+                return [self.generador.generar_notificacion_logro(
+                    'primera_tarea', {'usuario_id': usuario.id}
+                )]
+            if completadas == 10:
+                return [self.generador.generar_notificacion_logro(
+                    '10_tareas_completadas', {'total': completadas}
+                )]
+            return []
+
         for tarea in tareas:
-            dias = tarea.dias_restantes()
+            dias = (tarea.fecha_limite - ahora).days
             if dias <= 3:  # Solo notificar tareas con menos de 3 días
                 notif = self.generador.generar_notificacion_tarea_urgente(
                     tarea, dias
@@ -365,39 +483,40 @@ class GestorNotificaciones:
         #     notificaciones.append(notif)
         
         # 3. Generar recordatorio de estudio (una vez al día)
-        materias_con_tareas = set(t.curso for t in tareas)
-        if materias_con_tareas:
+        # Deduplicar por código (hash de string en C) en lugar de por
+        # objeto Curso completo, que pagaría __hash__/__eq__ por tarea
+        materias_unicas = {}
+        for t in tareas:
+            materias_unicas.setdefault(t.curso_codigo, t.curso)
+        if materias_unicas:
             notif = self.generador.generar_recordatorio_estudio(
-                usuario, list(materias_con_tareas)
+                usuario, list(materias_unicas.values())
             )
             notificaciones.append(notif)
         
-        # 4. Verificar logros
-        stats = usuario.obtener_estadisticas()
-        if stats['completadas'] == 1:
+        # 4. Verificar logros. Solo se necesita el conteo de completadas:
+        # un COUNT escalar en vez de obtener_estadisticas(), que
+        # materializa todas las tareas y materias del usuario
+        completadas = usuario.contar_tareas_completadas()
+        if completadas == 1:
             notif = self.generador.generar_notificacion_logro(
                 'primera_tarea',
                 {'usuario_id': usuario.id}
             )
             notificaciones.append(notif)
-        elif stats['completadas'] == 10:
+        elif completadas == 10:
             notif = self.generador.generar_notificacion_logro(
                 '10_tareas_completadas',
-                {'total': stats['completadas']}
+                {'total': completadas}
             )
             notificaciones.append(notif)
         
-        # Ordenar por prioridad (crítica primero)
-        orden_prioridad = {
-            PrioridadNotificacion.CRITICA: 0,
-            PrioridadNotificacion.ALTA: 1,
-            PrioridadNotificacion.MEDIA: 2,
-            PrioridadNotificacion.BAJA: 3
-        }
-        
-        notificaciones.sort(key=lambda n: orden_prioridad[n.prioridad])
-        
-        return notificaciones
+        # Ordenar por prioridad (crítica primero): con solo 4 niveles un
+        # bucket sort es O(N) sin comparaciones y estable por construcción
+        buckets = ([], [], [], [])
+        for n in notificaciones:
+            buckets[n.prioridad.orden].append(n)
+        return [n for bucket in buckets for n in bucket]
     
     def filtrar_por_prioridad(
         self,
@@ -414,18 +533,11 @@ class GestorNotificaciones:
         Returns:
             Lista filtrada de notificaciones
         """
-        orden = {
-            PrioridadNotificacion.CRITICA: 0,
-            PrioridadNotificacion.ALTA: 1,
-            PrioridadNotificacion.MEDIA: 2,
-            PrioridadNotificacion.BAJA: 3
-        }
-        
-        umbral = orden[prioridad_minima]
-        
+        umbral = prioridad_minima.orden
+
         return [
             n for n in notificaciones
-            if orden[n.prioridad] <= umbral
+            if n.prioridad.orden <= umbral
         ]
 
 
@@ -1,35 +1,177 @@
 import psycopg2
-from psycopg2.extras import RealDictCursor
+import psycopg2.extensions
+from psycopg2 import pool as psycopg2_pool
+from psycopg2.extras import RealDictCursor, execute_values
 import hashlib
-import json
+import hmac
 import os
+import threading
+import time
+from collections import defaultdict
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Tuple
 
 # ========== CLASE BASE ==========
 
+# Sentencias calientes preparadas en el servidor una vez por conexión
+# del pool: Postgres cachea el plan y se ahorra parse+plan por llamada
+_SENTENCIAS_PREPARADAS = (
+    'PREPARE usuario_por_id AS SELECT * FROM usuarios WHERE id = $1',
+    'PREPARE curso_por_codigo AS SELECT * FROM cursos WHERE codigo = $1',
+    'PREPARE tarea_por_id AS SELECT * FROM tareas WHERE id = $1',
+)
+
+
+class _ConexionPreparada(psycopg2.extensions.connection):
+    """Conexión que recuerda si ya preparó las sentencias calientes."""
+    sentencias_preparadas = False
+
+
+class _ConexionPrestada:
+    """
+    Proxy sobre una conexión tomada del pool.
+
+    Mantiene el contrato de los modelos (conn = get_connection() ...
+    conn.close()): close() devuelve la conexión al pool en lugar de
+    cerrar el socket, así ningún call site paga el handshake
+    TCP+TLS+auth contra Postgres por consulta.
+    """
+    __slots__ = ('_pool', '_conn')
+
+    def __init__(self, pool):
+        self._pool = pool
+        # _conn queda definido antes de pedir la conexión: si getconn()
+        # falla, __del__ encuentra un proxy consistente sin nada que devolver
+        self._conn = None
+        self._conn = pool.getconn()
+        # Autocommit por defecto: los SELECT (la gran mayoría de las
+        # consultas) dejan de pagar el BEGIN/COMMIT implícito y de
+        # retener snapshots que frenan el VACUUM. Las escrituras
+        # multi-sentencia abren su transacción explícitamente
+        self._conn.autocommit = True
+        # Las sentencias preparadas viven por sesión: se instalan la
+        # primera vez que esta conexión sale del pool
+        if not self._conn.sentencias_preparadas:
+            cursor = self._conn.cursor()
+            for sentencia in _SENTENCIAS_PREPARADAS:
+                cursor.execute(sentencia)
+            self._conn.sentencias_preparadas = True
+
+    def close(self):
+        """Devuelve la conexión al pool (putconn hace rollback si quedó sucia)."""
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            try:
+                # Si el socket murió, el reset de autocommit fallaría;
+                # putconn debe ejecutarse igual para liberar el slot
+                # (el pool descarta él mismo las conexiones cerradas)
+                if not conn.closed:
+                    conn.autocommit = True
+            finally:
+                self._pool.putconn(conn)
+
+    def __del__(self):
+        # Red de seguridad: si una excepción en el modelo se salta el
+        # close() explícito, el proxy devuelve la conexión al pool al
+        # recolectarse en lugar de quemar un slot para siempre
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def __getattr__(self, nombre):
+        return getattr(self._conn, nombre)
+
+    def __setattr__(self, nombre, valor):
+        if nombre in _ConexionPrestada.__slots__:
+            object.__setattr__(self, nombre, valor)
+        else:
+            setattr(self._conn, nombre, valor)
+
+
 class DatabaseModel:
     """Clase base con utilidades comunes para PostgreSQL"""
-    
+
+    # Sin atributos de instancia propios: __slots__ vacío para que las
+    # subclases con __slots__ realmente queden sin __dict__
+    __slots__ = ()
+
+    _pool = None
+    _pool_lock = threading.Lock()
+
+    @classmethod
+    def _obtener_pool(cls):
+        """Construye (una sola vez) el pool de conexiones del proceso."""
+        if DatabaseModel._pool is None:
+            with DatabaseModel._pool_lock:
+                if DatabaseModel._pool is None:
+                    database_url = os.environ.get('DATABASE_URL')
+
+                    if not database_url:
+                        raise ValueError(
+                            "DATABASE_URL no está configurada. "
+                        )
+
+                    # libpq acepta postgresql:// y postgres:// por igual:
+                    # la URL se pasa tal cual, sin reescrituras
+                    DatabaseModel._pool = psycopg2_pool.ThreadedConnectionPool(
+                        minconn=1,
+                        maxconn=10,
+                        dsn=database_url,
+                        connection_factory=_ConexionPreparada,
+                        cursor_factory=RealDictCursor
+                    )
+        return DatabaseModel._pool
+
     @staticmethod
     def get_connection():
-        """Obtiene conexión a PostgreSQL desde variable de entorno"""
-        database_url = os.environ.get('DATABASE_URL')
-        
-        if not database_url:
-            raise ValueError(
-                "DATABASE_URL no está configurada. "
+        """Obtiene una conexión del pool (se devuelve con .close())."""
+        return _ConexionPrestada(DatabaseModel._obtener_pool())
+
+    # Parámetros de scrypt (stdlib): KDF con sal y costo de memoria,
+    # resistente a GPU, sin dependencias nuevas
+    _SCRYPT_N = 2 ** 14
+    _SCRYPT_R = 8
+    _SCRYPT_P = 1
+
+    @classmethod
+    def encriptar_password(cls, password: str) -> str:
+        """Deriva el hash de la contrasena con scrypt y sal aleatoria."""
+        sal = os.urandom(16)
+        derivada = hashlib.scrypt(
+            password.encode(),
+            salt=sal,
+            n=cls._SCRYPT_N,
+            r=cls._SCRYPT_R,
+            p=cls._SCRYPT_P
+        )
+        return (
+            f"scrypt${cls._SCRYPT_N}${cls._SCRYPT_R}${cls._SCRYPT_P}"
+            f"${sal.hex()}${derivada.hex()}"
+        )
+
+    @classmethod
+    def verificar_password(cls, password: str, hash_almacenado: str) -> bool:
+        """
+        Verifica una contrasena contra el hash almacenado.
+
+        Soporta el formato scrypt actual y los hashes SHA-256 legados
+        (sin sal); en ambos casos la comparación es de tiempo constante.
+        """
+        if hash_almacenado.startswith('scrypt$'):
+            _, n, r, p, sal_hex, hash_hex = hash_almacenado.split('$')
+            derivada = hashlib.scrypt(
+                password.encode(),
+                salt=bytes.fromhex(sal_hex),
+                n=int(n),
+                r=int(r),
+                p=int(p)
             )
-        
-        if database_url.startswith('postgresql://'):
-            database_url = database_url.replace('postgresql://', 'postgres://', 1)
-        
-        return psycopg2.connect(database_url, cursor_factory=RealDictCursor)
-    
-    @staticmethod
-    def encriptar_password(password: str) -> str:
-        """Genera un hash SHA-256 de la contrasena."""
-        return hashlib.sha256(password.encode()).hexdigest()
+            return hmac.compare_digest(derivada.hex(), hash_hex)
+
+        # Hash legado SHA-256
+        calculado = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(calculado, hash_almacenado)
 
 
 # ========== USUARIO ==========
@@ -47,12 +189,29 @@ class Usuario(DatabaseModel):
         self.carrera = carrera
         self.semestre_actual = semestre_actual
         self.tipo_estudio = tipo_estudio
-    
+        # Memoización por instancia: el objeto vive lo que dura la
+        # petición HTTP, así que cachear aquí colapsa los SELECT
+        # repetidos dentro de una misma petición
+        self._memo: Dict[str, List['Curso']] = {}
+
     @property
     def nombre_completo(self):
         """Retorna el nombre completo en formato 'Nombre Apellido'."""
         return f"{self.nombre} {self.apellido}"
-    
+
+    @classmethod
+    def from_row(cls, row: Dict) -> 'Usuario':
+        """Construye un Usuario a partir de una fila de la tabla usuarios."""
+        return cls(
+            id=row['id'],
+            nombre=row['nombre'],
+            apellido=row['apellido'],
+            email=row['email'],
+            carrera=row['carrera'],
+            semestre_actual=row['semestre_actual'],
+            tipo_estudio=row['tipo_estudio']
+        )
+
     @classmethod
     def crear(cls, nombre: str, apellido: str, email: str, password: str,
               semestre_actual: int, tipo_estudio: str,
@@ -60,8 +219,11 @@ class Usuario(DatabaseModel):
               materias_cursando: List[str] = None) -> 'Usuario':
         """Crea un usuario y registra materias aprobadas y en curso."""
         conn = cls.get_connection()
+        # Escritura multi-sentencia: transacción explícita para que
+        # usuario y materias se confirmen (o reviertan) juntos
+        conn.autocommit = False
         cursor = conn.cursor()
-        
+
         try:
             password_hash = cls.encriptar_password(password)
             
@@ -69,33 +231,33 @@ class Usuario(DatabaseModel):
             INSERT INTO usuarios 
             (nombre, apellido, email, password_hash, semestre_actual, tipo_estudio, carrera)
             VALUES (%s, %s, %s, %s, %s, %s, %s)
-            RETURNING id
-            ''', (nombre, apellido, email, password_hash, semestre_actual, 
+            RETURNING *
+            ''', (nombre, apellido, email, password_hash, semestre_actual,
                   tipo_estudio, 'Ingeniería de Sistemas'))
+
+            usuario_row = cursor.fetchone()
+            usuario_id = usuario_row['id']
             
-            usuario_id = cursor.fetchone()['id']
-            
-            # Registrar materias aprobadas
+            # Registrar materias aprobadas y actuales en un INSERT por
+            # tabla: un viaje a la base por lote en lugar de uno por fila
             if materias_aprobadas:
-                for codigo in materias_aprobadas:
-                    cursor.execute('''
-                    INSERT INTO historial_academico (usuario_id, curso_codigo, estado)
-                    VALUES (%s, %s, 'aprobado')
-                    ON CONFLICT (usuario_id, curso_codigo) DO NOTHING
-                    ''', (usuario_id, codigo))
-            
-            # Registrar materias actuales
+                execute_values(cursor, '''
+                INSERT INTO historial_academico (usuario_id, curso_codigo, estado)
+                VALUES %s
+                ON CONFLICT (usuario_id, curso_codigo) DO NOTHING
+                ''', [(usuario_id, codigo, 'aprobado') for codigo in materias_aprobadas])
+
             if materias_cursando:
-                for codigo in materias_cursando:
-                    cursor.execute('''
-                    INSERT INTO materias_actuales (usuario_id, curso_codigo)
-                    VALUES (%s, %s)
-                    ON CONFLICT (usuario_id, curso_codigo) DO NOTHING
-                    ''', (usuario_id, codigo))
+                execute_values(cursor, '''
+                INSERT INTO materias_actuales (usuario_id, curso_codigo)
+                VALUES %s
+                ON CONFLICT (usuario_id, curso_codigo) DO NOTHING
+                ''', [(usuario_id, codigo) for codigo in materias_cursando])
             
             conn.commit()
-            return cls.obtener_por_id(usuario_id)
-            
+            # RETURNING * ya trae la fila completa: no hace falta otro SELECT
+            return cls.from_row(usuario_row)
+
         except psycopg2.IntegrityError:
             conn.rollback()
             raise ValueError(f"El correo '{email}' ya está registrado")
@@ -110,174 +272,307 @@ class Usuario(DatabaseModel):
         """Autentica un usuario"""
         conn = cls.get_connection()
         cursor = conn.cursor()
-        
-        password_hash = cls.encriptar_password(password)
-        
+
+        # Se busca solo por email (índice único) y se verifica el hash en
+        # Python: así el KDF se ejecuta una sola vez por intento
         cursor.execute('''
-        SELECT * FROM usuarios 
-        WHERE email = %s AND password_hash = %s AND activo = TRUE
-        ''', (email, password_hash))
-        
+        SELECT * FROM usuarios
+        WHERE email = %s AND activo = TRUE
+        ''', (email,))
+
         row = cursor.fetchone()
+
+        if row and cls.verificar_password(password, row['password_hash']):
+            # Migración transparente de hashes legados al formato scrypt
+            if not row['password_hash'].startswith('scrypt$'):
+                cursor.execute(
+                    'UPDATE usuarios SET password_hash = %s WHERE id = %s',
+                    (cls.encriptar_password(password), row['id'])
+                )
+                conn.commit()
+            conn.close()
+            return cls.from_row(row)
+
         conn.close()
-        
-        if row:
-            return cls(
-                id=row['id'],
-                nombre=row['nombre'],
-                apellido=row['apellido'],
-                email=row['email'],
-                carrera=row['carrera'],
-                semestre_actual=row['semestre_actual'],
-                tipo_estudio=row['tipo_estudio']
-            )
         return None
-    
+
     @classmethod
-    def obtener_por_id(cls, usuario_id: int) -> Optional['Usuario']:
+    def obtener_por_id(cls, usuario_id: int, conn=None) -> Optional['Usuario']:
         """Obtiene usuario por ID"""
-        conn = cls.get_connection()
+        conn_propia = conn is None
+        if conn_propia:
+            conn = cls.get_connection()
         cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM usuarios WHERE id = %s', (usuario_id,))
+
+        cursor.execute('EXECUTE usuario_por_id(%s)', (usuario_id,))
         row = cursor.fetchone()
-        conn.close()
-        
-        if row:
-            return cls(
-                id=row['id'],
-                nombre=row['nombre'],
-                apellido=row['apellido'],
-                email=row['email'],
-                carrera=row['carrera'],
-                semestre_actual=row['semestre_actual'],
-                tipo_estudio=row['tipo_estudio']
-            )
-        return None
+        if conn_propia:
+            conn.close()
+
+        return cls.from_row(row) if row else None
     
-    def obtener_materias_actuales(self) -> List['Curso']:
+    def obtener_materias_actuales(self, conn=None) -> List['Curso']:
         """Obtiene las materias que está cursando"""
-        conn = self.get_connection()
+        if 'actuales' in self._memo:
+            return self._memo['actuales']
+
+        conn_propia = conn is None
+        if conn_propia:
+            conn = self.get_connection()
         cursor = conn.cursor()
-        
+
         cursor.execute('''
         SELECT c.* FROM cursos c
         INNER JOIN materias_actuales ma ON c.codigo = ma.curso_codigo
         WHERE ma.usuario_id = %s AND ma.estado = 'activo'
         ORDER BY c.nombre
         ''', (self.id,))
-        
-        rows = cursor.fetchall()
-        conn.close()
-        
-        return [Curso.from_row(row) for row in rows]
-    
-    def obtener_materias_aprobadas(self) -> List['Curso']:
+
+        cursos = [Curso.from_row(row) for row in cursor.fetchall()]
+        if conn_propia:
+            conn.close()
+
+        self._memo['actuales'] = cursos
+        return cursos
+
+    def obtener_materias_aprobadas(self, conn=None) -> List['Curso']:
         """Obtiene las materias que ya aprobó"""
-        conn = self.get_connection()
+        if 'aprobadas' in self._memo:
+            return self._memo['aprobadas']
+
+        conn_propia = conn is None
+        if conn_propia:
+            conn = self.get_connection()
         cursor = conn.cursor()
-        
+
         cursor.execute('''
         SELECT c.* FROM cursos c
         INNER JOIN historial_academico ha ON c.codigo = ha.curso_codigo
         WHERE ha.usuario_id = %s AND ha.estado = 'aprobado'
         ORDER BY c.semestre, c.nombre
         ''', (self.id,))
-        
-        rows = cursor.fetchall()
-        conn.close()
-        
-        return [Curso.from_row(row) for row in rows]
-    
-    def calcular_creditos_acumulados(self) -> int:
-        """Calcula el total de créditos aprobados"""
-        materias = self.obtener_materias_aprobadas()
-        return sum(m.creditos for m in materias)
-    
-    def puede_inscribir_materia(self, codigo_materia: str) -> Tuple[bool, str]:
-        """Verifica si puede inscribir una materia"""
-        curso = Curso.obtener_por_codigo(codigo_materia)
-        if not curso:
-            return False, "Materia no encontrada"
-        
-        materias_aprobadas = [c.codigo for c in self.obtener_materias_aprobadas()]
-        if codigo_materia in materias_aprobadas:
-            return False, "Ya aprobaste esta materia"
-        
-        materias_actuales = [c.codigo for c in self.obtener_materias_actuales()]
-        if codigo_materia in materias_actuales:
-            return False, "Ya estás cursando esta materia"
-        
-        creditos_acumulados = self.calcular_creditos_acumulados()
-        if curso.creditos_requisitos > creditos_acumulados:
-            return False, f"Necesitas {curso.creditos_requisitos} créditos aprobados (tienes {creditos_acumulados})"
-        
-        if curso.requisitos:
-            for req in curso.requisitos:
-                if req not in materias_aprobadas:
-                    req_nombre = Curso.obtener_por_codigo(req)
-                    return False, f"Falta requisito: {req_nombre.nombre if req_nombre else req}"
-        
-        return True, "OK"
-    
-    def inscribir_materia(self, codigo_materia: str) -> bool:
-        """Inscribe una materia"""
-        puede, razon = self.puede_inscribir_materia(codigo_materia)
-        if not puede:
-            raise ValueError(razon)
-        
-        conn = self.get_connection()
+
+        cursos = [Curso.from_row(row) for row in cursor.fetchall()]
+        if conn_propia:
+            conn.close()
+
+        self._memo['aprobadas'] = cursos
+        return cursos
+
+    def calcular_creditos_acumulados(self, conn=None) -> int:
+        """
+        Calcula el total de créditos aprobados.
+
+        La suma se hace en el motor: antes viajaban todas las filas de
+        cursos aprobados solo para sumar un entero en Python.
+        """
+        conn_propia = conn is None
+        if conn_propia:
+            conn = self.get_connection()
         cursor = conn.cursor()
-        
+
+        cursor.execute('''
+        SELECT COALESCE(SUM(c.creditos), 0) AS total
+        FROM historial_academico ha
+        JOIN cursos c ON c.codigo = ha.curso_codigo
+        WHERE ha.usuario_id = %s AND ha.estado = 'aprobado'
+        ''', (self.id,))
+        total = cursor.fetchone()['total']
+
+        if conn_propia:
+            conn.close()
+
+        return total
+
+    def puede_inscribir_materia(self, codigo_materia: str, conn=None) -> Tuple[bool, str]:
+        """
+        Verifica si puede inscribir una materia.
+
+        Una sola consulta con CTEs resuelve la membresía (EXISTS), los
+        requisitos faltantes y los créditos acumulados en el motor:
+        viajan dos booleanos, un entero y, a lo sumo, el puñado de
+        códigos de requisito que falten, en lugar de los listados
+        completos de aprobadas y actuales.
+        """
+        conn_propia = conn is None
+        if conn_propia:
+            conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+        WITH aprobadas AS (
+            SELECT ha.curso_codigo FROM historial_academico ha
+            WHERE ha.usuario_id = %s AND ha.estado = 'aprobado'
+        )
+        SELECT c.creditos_requisitos,
+               EXISTS(SELECT 1 FROM aprobadas a
+                      WHERE a.curso_codigo = c.codigo) AS ya_aprobada,
+               EXISTS(SELECT 1 FROM materias_actuales ma
+                      WHERE ma.usuario_id = %s AND ma.curso_codigo = c.codigo
+                        AND ma.estado = 'activo') AS ya_cursando,
+               ARRAY(SELECT r FROM unnest(c.requisitos) AS r
+                     WHERE r NOT IN (SELECT curso_codigo FROM aprobadas)
+                    ) AS requisitos_faltantes,
+               (SELECT COALESCE(SUM(cr.creditos), 0)
+                FROM aprobadas a
+                JOIN cursos cr ON cr.codigo = a.curso_codigo) AS creditos_acumulados
+        FROM cursos c
+        WHERE c.codigo = %s
+        ''', (self.id, self.id, codigo_materia))
+        row = cursor.fetchone()
+
+        if conn_propia and row is None:
+            conn.close()
+        if row is None:
+            return False, "Materia no encontrada"
+
+        creditos_acumulados = row['creditos_acumulados']
+        creditos_requisitos = row['creditos_requisitos']
+
+        try:
+            if row['ya_aprobada']:
+                return False, "Ya aprobaste esta materia"
+
+            if row['ya_cursando']:
+                return False, "Ya estás cursando esta materia"
+
+            if creditos_requisitos > creditos_acumulados:
+                return False, f"Necesitas {creditos_requisitos} créditos aprobados (tienes {creditos_acumulados})"
+
+            if row['requisitos_faltantes']:
+                # Solo el camino de error paga la consulta del nombre
+                req = row['requisitos_faltantes'][0]
+                req_nombre = Curso.obtener_por_codigo(req, conn=conn)
+                return False, f"Falta requisito: {req_nombre.nombre if req_nombre else req}"
+
+            return True, "OK"
+        finally:
+            if conn_propia:
+                conn.close()
+
+    def inscribir_materia(self, codigo_materia: str, conn=None) -> bool:
+        """
+        Inscribe una materia en una sola sentencia atómica.
+
+        El INSERT ... SELECT evalúa la elegibilidad (no aprobada, no
+        cursando, créditos y requisitos) dentro del propio INSERT: sin
+        ventana entre verificación e inserción, dos peticiones
+        concurrentes no pueden inscribir dos veces. Solo el camino de
+        fallo paga la consulta diagnóstica para explicar la razón.
+        """
+        conn_propia = conn is None
+        if conn_propia:
+            conn = self.get_connection()
+
         try:
+            cursor = conn.cursor()
             cursor.execute('''
+            WITH aprobadas AS (
+                SELECT curso_codigo FROM historial_academico
+                WHERE usuario_id = %(uid)s AND estado = 'aprobado'
+            )
             INSERT INTO materias_actuales (usuario_id, curso_codigo)
-            VALUES (%s, %s)
-            ''', (self.id, codigo_materia))
-            
+            SELECT %(uid)s, c.codigo
+            FROM cursos c
+            WHERE c.codigo = %(codigo)s
+              AND NOT EXISTS (SELECT 1 FROM aprobadas a
+                              WHERE a.curso_codigo = c.codigo)
+              AND NOT EXISTS (SELECT 1 FROM materias_actuales ma
+                              WHERE ma.usuario_id = %(uid)s
+                                AND ma.curso_codigo = c.codigo
+                                AND ma.estado = 'activo')
+              AND c.creditos_requisitos <= (
+                  SELECT COALESCE(SUM(cr.creditos), 0)
+                  FROM aprobadas a
+                  JOIN cursos cr ON cr.codigo = a.curso_codigo)
+              AND COALESCE(c.requisitos, '{}') <@
+                  ARRAY(SELECT curso_codigo FROM aprobadas)
+            RETURNING id
+            ''', {'uid': self.id, 'codigo': codigo_materia})
+            row = cursor.fetchone()
             conn.commit()
+
+            if row is None:
+                # Cero filas insertadas: una consulta extra explica cuál
+                # regla falló
+                puede, razon = self.puede_inscribir_materia(codigo_materia, conn=conn)
+                raise ValueError(razon if not puede else "No se pudo inscribir la materia")
+
+            self._memo.pop('actuales', None)
             return True
+        except ValueError:
+            raise
         except Exception as e:
             conn.rollback()
             raise e
         finally:
-            conn.close()
-    
-    def cancelar_materia(self, codigo_materia: str) -> bool:
+            if conn_propia:
+                conn.close()
+
+    def cancelar_materia(self, codigo_materia: str, conn=None) -> bool:
         """Cancela una materia"""
-        conn = self.get_connection()
+        conn_propia = conn is None
+        if conn_propia:
+            conn = self.get_connection()
         cursor = conn.cursor()
-        
+
         cursor.execute('''
-        UPDATE materias_actuales 
+        UPDATE materias_actuales
         SET estado = 'cancelado'
         WHERE usuario_id = %s AND curso_codigo = %s AND estado = 'activo'
         ''', (self.id, codigo_materia))
-        
+
         affected = cursor.rowcount
         conn.commit()
-        conn.close()
-        
+        if conn_propia:
+            conn.close()
+
+        if affected:
+            self._memo.pop('actuales', None)
         return affected > 0
     
-    def obtener_tareas(self, solo_pendientes: bool = False) -> List['Tarea']:
-        """Obtiene todas las tareas del usuario"""
+    def obtener_tareas(self, solo_pendientes: bool = False,
+                       limit: Optional[int] = None) -> List['Tarea']:
+        """
+        Obtiene las tareas del usuario ordenadas por urgencia.
+
+        El curso de cada tarea viene en la misma consulta vía LEFT JOIN
+        (columnas c_*): una sola consulta en lugar del patrón N+1 que
+        disparaba un SELECT de curso por tarea instanciada. Con `limit`
+        el recorte lo hace el motor (ORDER BY fecha_limite + LIMIT sobre
+        índice), sin traer el listado completo para descartarlo en
+        Python.
+        """
         conn = self.get_connection()
         cursor = conn.cursor()
-        
-        query = 'SELECT * FROM tareas WHERE usuario_id = %s'
+
+        query = '''
+        SELECT t.*,
+               c.codigo AS c_codigo, c.nombre AS c_nombre,
+               c.creditos AS c_creditos, c.semestre AS c_semestre,
+               c.ht AS c_ht, c.hp AS c_hp,
+               c.requisitos AS c_requisitos,
+               c.creditos_requisitos AS c_creditos_requisitos
+        FROM tareas t
+        LEFT JOIN cursos c ON c.codigo = t.curso_codigo
+        WHERE t.usuario_id = %s
+        '''
         params = [self.id]
-        
+
         if solo_pendientes:
-            query += ' AND completada = FALSE'
-        
-        query += ' ORDER BY fecha_limite ASC'
-        
+            query += ' AND t.completada = FALSE'
+
+        query += ' ORDER BY t.fecha_limite ASC'
+
+        if limit is not None:
+            query += ' LIMIT %s'
+            params.append(limit)
+
         cursor.execute(query, params)
-        rows = cursor.fetchall()
+        tareas = [Tarea.from_row_con_curso(row) for row in cursor.fetchall()]
         conn.close()
-        
-        return [Tarea.from_row(row) for row in rows]
+
+        return tareas
     
     def agregar_tarea(self, curso_codigo: str, titulo: str, tipo: str,
                      fecha_limite: str, horas_estimadas: float = 4,
@@ -295,27 +590,162 @@ class Usuario(DatabaseModel):
             dificultad=dificultad
         )
     
-    def obtener_estadisticas(self) -> Dict:
-        """Calcula estadísticas del usuario"""
-        tareas = self.obtener_tareas()
-        tareas_pendientes = [t for t in tareas if not t.completada]
-        tareas_completadas = [t for t in tareas if t.completada]
-        
-        materias_actuales = self.obtener_materias_actuales()
-        materias_aprobadas = self.obtener_materias_aprobadas()
-        
-        total_creditos_actuales = sum(m.creditos for m in materias_actuales)
-        total_creditos_aprobados = sum(m.creditos for m in materias_aprobadas)
-        
+    def obtener_resumen_tareas(self, dias_criticos: int = 3, conn=None) -> Dict:
+        """
+        Calcula en SQL el resumen de tareas para las estadísticas detalladas.
+
+        Las reducciones (conteos, sumas de horas, promedio de dificultad,
+        distribución por materia/tipo y materias críticas) se ejecutan en
+        el motor con agregados y GROUP BY en lugar de iterar objetos
+        Tarea en Python.
+        """
+        conn_propia = conn is None
+        if conn_propia:
+            conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+        SELECT COUNT(*) AS total_tareas,
+               COUNT(*) FILTER (WHERE completada) AS completadas,
+               COALESCE(SUM(horas_estimadas) FILTER (WHERE NOT completada), 0)::float
+                   AS horas_pendientes,
+               COALESCE(AVG(dificultad) FILTER (WHERE NOT completada), 0)::float
+                   AS dificultad_promedio
+        FROM tareas
+        WHERE usuario_id = %s
+        ''', (self.id,))
+        totales = cursor.fetchone()
+
+        cursor.execute('''
+        SELECT COALESCE(c.nombre, t.curso_codigo, 'Sin curso') AS materia,
+               COALESCE(t.tipo, 'General') AS tipo,
+               COALESCE(SUM(t.horas_estimadas), 0)::float AS horas
+        FROM tareas t
+        LEFT JOIN cursos c ON c.codigo = t.curso_codigo
+        WHERE t.usuario_id = %s AND t.completada = FALSE
+        GROUP BY 1, 2
+        ''', (self.id,))
+        grupos = cursor.fetchall()
+
+        # Equivalente a dias_restantes() <= dias_criticos - 1 con
+        # truncamiento de timedelta; la comparación se resuelve en el motor
+        cursor.execute('''
+        SELECT DISTINCT COALESCE(c.nombre, t.curso_codigo, 'Sin curso') AS materia
+        FROM tareas t
+        LEFT JOIN cursos c ON c.codigo = t.curso_codigo
+        WHERE t.usuario_id = %s AND t.completada = FALSE
+          AND t.fecha_limite < NOW() + %s * INTERVAL '1 day'
+        ''', (self.id, dias_criticos))
+        criticas = cursor.fetchall()
+
+        if conn_propia:
+            conn.close()
+
+        # defaultdict: un solo hash + store por suma, sin el get() previo
+        acumulado_materia: Dict[str, float] = defaultdict(float)
+        acumulado_tipo: Dict[str, float] = defaultdict(float)
+        for grupo in grupos:
+            horas = grupo['horas']
+            acumulado_materia[grupo['materia']] += horas
+            acumulado_tipo[grupo['tipo']] += horas
+
+        distribucion_materia = {
+            materia: round(horas, 1)
+            for materia, horas in acumulado_materia.items()
+        }
+        distribucion_tipo = {
+            tipo: round(horas, 1)
+            for tipo, horas in acumulado_tipo.items()
+        }
+
+        total_tareas = totales['total_tareas']
+        completadas = totales['completadas']
+
         return {
-            'total_tareas': len(tareas),
-            'pendientes': len(tareas_pendientes),
-            'completadas': len(tareas_completadas),
-            'materias_actuales': len(materias_actuales),
-            'materias_aprobadas': len(materias_aprobadas),
-            'creditos_actuales': total_creditos_actuales,
-            'creditos_aprobados': total_creditos_aprobados,
-            'porcentaje_completado': (len(tareas_completadas) / len(tareas) * 100) if tareas else 0
+            'total_tareas': total_tareas,
+            'completadas': completadas,
+            'pendientes': total_tareas - completadas,
+            'horas_pendientes': round(totales['horas_pendientes'], 1),
+            'dificultad_promedio': round(totales['dificultad_promedio'], 2),
+            'distribucion_materia': distribucion_materia,
+            'distribucion_tipo': distribucion_tipo,
+            'materias_criticas': [row['materia'] for row in criticas]
+        }
+
+    def contar_tareas_completadas(self, conn=None) -> int:
+        """
+        Cuenta las tareas completadas con un único COUNT en SQL.
+
+        Más barato que obtener_estadisticas() cuando solo se necesita
+        el conteo (p. ej. el chequeo de logros en notificaciones), que
+        de otro modo materializa tareas y materias completas.
+        """
+        conn_propia = conn is None
+        if conn_propia:
+            conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute(
+            'SELECT COUNT(*) AS completadas FROM tareas '
+            'WHERE usuario_id = %s AND completada = TRUE',
+            (self.id,)
+        )
+        completadas = cursor.fetchone()['completadas']
+
+        if conn_propia:
+            conn.close()
+
+        return completadas
+
+    def obtener_estadisticas(self, conn=None) -> Dict:
+        """
+        Calcula estadísticas del usuario.
+
+        Una sola consulta agregada: antes eran 3 consultas que
+        materializaban todas las tareas y materias en Python solo para
+        contarlas y sumarlas.
+        """
+        conn_propia = conn is None
+        if conn_propia:
+            conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+        SELECT
+            (SELECT COUNT(*) FROM tareas
+             WHERE usuario_id = %(uid)s) AS total_tareas,
+            (SELECT COUNT(*) FROM tareas
+             WHERE usuario_id = %(uid)s AND completada = TRUE) AS completadas,
+            (SELECT COUNT(*) FROM materias_actuales
+             WHERE usuario_id = %(uid)s AND estado = 'activo') AS materias_actuales,
+            (SELECT COUNT(*) FROM historial_academico
+             WHERE usuario_id = %(uid)s AND estado = 'aprobado') AS materias_aprobadas,
+            (SELECT COALESCE(SUM(c.creditos), 0)
+             FROM materias_actuales ma
+             JOIN cursos c ON c.codigo = ma.curso_codigo
+             WHERE ma.usuario_id = %(uid)s AND ma.estado = 'activo') AS creditos_actuales,
+            (SELECT COALESCE(SUM(c.creditos), 0)
+             FROM historial_academico ha
+             JOIN cursos c ON c.codigo = ha.curso_codigo
+             WHERE ha.usuario_id = %(uid)s AND ha.estado = 'aprobado') AS creditos_aprobados
+        ''', {'uid': self.id})
+        row = cursor.fetchone()
+
+        if conn_propia:
+            conn.close()
+
+        total_tareas = row['total_tareas']
+        completadas = row['completadas']
+
+        return {
+            'total_tareas': total_tareas,
+            'pendientes': total_tareas - completadas,
+            'completadas': completadas,
+            'materias_actuales': row['materias_actuales'],
+            'materias_aprobadas': row['materias_aprobadas'],
+            'creditos_actuales': row['creditos_actuales'],
+            'creditos_aprobados': row['creditos_aprobados'],
+            'porcentaje_completado': (completadas / total_tareas * 100) if total_tareas else 0
         }
 
 
@@ -323,7 +753,23 @@ class Usuario(DatabaseModel):
 
 class Curso(DatabaseModel):
     """Modelo de Curso"""
-    
+
+    # Caché en proceso del pensum: los cursos son datos de referencia
+    # que cambian en escala de días pero se consultan en cada petición.
+    # {codigo: (monotonic, Curso | None)}
+    # El código llega tal cual de la URL sin autenticar: el tope evita
+    # que sondear códigos inexistentes (cacheados como None) crezca el
+    # dict sin límite, igual que en los cachés de calendario y
+    # notificaciones. El pensum real son ~50 códigos: lejos del tope
+    _cache: Dict[str, tuple] = {}
+    _CACHE_TTL = 3600  # segundos
+    _CACHE_MAX = 256   # claves distintas antes de vaciar
+
+    # Portador de datos puro instanciado por lotes: sin __dict__ cada
+    # instancia ocupa cerca de la mitad
+    __slots__ = ('codigo', 'nombre', 'creditos', 'semestre', 'ht', 'hp',
+                 'requisitos', 'creditos_requisitos', 'peso')
+
     def __init__(self, codigo: str, nombre: str, creditos: int,
                  semestre: int, ht: int = 0, hp: int = 0,
                  requisitos: List[str] = None, creditos_requisitos: int = 0):
@@ -341,7 +787,7 @@ class Curso(DatabaseModel):
     @classmethod
     def from_row(cls, row) -> 'Curso':
         """Construye un Curso desde una fila de la base de datos."""
-        requisitos = row['requisitos'] if isinstance(row['requisitos'], list) else []
+        # requisitos es TEXT[]: psycopg2 ya lo entrega como lista
         return cls(
             codigo=row['codigo'],
             nombre=row['nombre'],
@@ -349,21 +795,40 @@ class Curso(DatabaseModel):
             semestre=row['semestre'],
             ht=row['ht'],
             hp=row['hp'],
-            requisitos=requisitos,
+            requisitos=row['requisitos'] or [],
             creditos_requisitos=row['creditos_requisitos']
         )
-    
+
     @classmethod
-    def obtener_por_codigo(cls, codigo: str) -> Optional['Curso']:
-        """Obtiene un curso por su codigo."""
-        conn = cls.get_connection()
+    def obtener_por_codigo(cls, codigo: str, conn=None) -> Optional['Curso']:
+        """Obtiene un curso por su codigo (cacheado en proceso con TTL)."""
+        entrada = cls._cache.get(codigo)
+        if entrada and time.monotonic() - entrada[0] < cls._CACHE_TTL:
+            return entrada[1]
+
+        conn_propia = conn is None
+        if conn_propia:
+            conn = cls.get_connection()
         cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM cursos WHERE codigo = %s', (codigo,))
+
+        cursor.execute('EXECUTE curso_por_codigo(%s)', (codigo,))
         row = cursor.fetchone()
-        conn.close()
-        
-        return cls.from_row(row) if row else None
+        if conn_propia:
+            conn.close()
+
+        curso = cls.from_row(row) if row else None
+        if len(cls._cache) >= cls._CACHE_MAX:
+            cls._cache.clear()
+        cls._cache[codigo] = (time.monotonic(), curso)
+        return curso
+
+    @classmethod
+    def invalidar_cache(cls, codigo: str = None):
+        """Invalida el caché de cursos (todo, o un código puntual)."""
+        if codigo is None:
+            cls._cache.clear()
+        else:
+            cls._cache.pop(codigo, None)
     
     @classmethod
     def obtener_por_semestre(cls, semestre: int) -> List['Curso']:
@@ -389,8 +854,16 @@ class Curso(DatabaseModel):
         cursor.execute('SELECT * FROM cursos ORDER BY semestre, nombre')
         rows = cursor.fetchall()
         conn.close()
-        
-        return [cls.from_row(row) for row in rows]
+
+        # El pensum completo (~50 filas) cabe de sobra en memoria:
+        # aprovechar la pasada para poblar el caché por código
+        cursos = [cls.from_row(row) for row in rows]
+        if len(cls._cache) + len(cursos) >= cls._CACHE_MAX:
+            cls._cache.clear()
+        marca = time.monotonic()
+        for curso in cursos:
+            cls._cache[curso.codigo] = (marca, curso)
+        return cursos
     
     @classmethod
     def buscar(cls, termino: str) -> List['Curso']:
@@ -412,14 +885,25 @@ class Curso(DatabaseModel):
 
 # ========== TAREA ==========
 
+# Sentinela para distinguir "curso no precargado" (hay que consultarlo)
+# de "precargado como None" (el JOIN no encontró curso)
+_CURSO_NO_PRECARGADO = object()
+
+
 class Tarea(DatabaseModel):
     """Modelo de Tarea"""
-    
+
+    __slots__ = ('id', 'usuario_id', 'curso_codigo', 'titulo',
+                 'descripcion', 'tipo', 'fecha_limite', 'completada',
+                 'curso', 'horas_estimadas', 'dificultad', 'prioridad',
+                 'porcentaje_completado')
+
     def __init__(self, id: int, usuario_id: int, curso_codigo: str,
                  titulo: str, descripcion: str, tipo: str,
                  fecha_limite: datetime, completada: bool,
                  horas_estimadas: float = 4, dificultad: int = 3,
-                 porcentaje_completado: int = 0):
+                 porcentaje_completado: int = 0,
+                 curso=_CURSO_NO_PRECARGADO):
         """Inicializa una tarea con sus metadatos y estado."""
         self.id = id
         self.usuario_id = usuario_id
@@ -429,9 +913,14 @@ class Tarea(DatabaseModel):
         self.tipo = tipo
         self.fecha_limite = fecha_limite
         self.completada = completada
-        
-        self.curso = Curso.obtener_por_codigo(curso_codigo)
-        
+
+        # Curso precargado (p. ej. por el JOIN de obtener_tareas); la
+        # consulta por código queda solo como fallback
+        if curso is _CURSO_NO_PRECARGADO:
+            self.curso = Curso.obtener_por_codigo(curso_codigo)
+        else:
+            self.curso = curso
+
         try:
             self.horas_estimadas = float(horas_estimadas) if horas_estimadas is not None else 4
         except (TypeError, ValueError):
@@ -462,7 +951,42 @@ class Tarea(DatabaseModel):
             dificultad=row.get('dificultad', 3),
             porcentaje_completado=row.get('porcentaje_completado')
         )
-    
+
+    @classmethod
+    def from_row_con_curso(cls, row) -> 'Tarea':
+        """
+        Construye una Tarea desde una fila que ya trae su curso.
+
+        Espera las columnas c_* del LEFT JOIN de obtener_tareas y arma
+        el Curso inline, sin viaje extra a la base por tarea.
+        """
+        curso = None
+        if row.get('c_codigo') is not None:
+            curso = Curso(
+                codigo=row['c_codigo'],
+                nombre=row['c_nombre'],
+                creditos=row['c_creditos'],
+                semestre=row['c_semestre'],
+                ht=row['c_ht'],
+                hp=row['c_hp'],
+                requisitos=row['c_requisitos'] or [],
+                creditos_requisitos=row['c_creditos_requisitos']
+            )
+        return cls(
+            id=row['id'],
+            usuario_id=row['usuario_id'],
+            curso_codigo=row['curso_codigo'],
+            titulo=row['titulo'],
+            descripcion=row['descripcion'] or "",
+            tipo=row['tipo'],
+            fecha_limite=row['fecha_limite'],
+            completada=bool(row['completada']),
+            horas_estimadas=row.get('horas_estimadas', 4),
+            dificultad=row.get('dificultad', 3),
+            porcentaje_completado=row.get('porcentaje_completado'),
+            curso=curso
+        )
+
     @classmethod
     def crear(cls, usuario_id: int, curso_codigo: str, titulo: str,
               descripcion: str, tipo: str, fecha_limite: str,
@@ -479,13 +1003,14 @@ class Tarea(DatabaseModel):
             INSERT INTO tareas 
             (usuario_id, curso_codigo, titulo, descripcion, tipo, fecha_limite, horas_estimadas, dificultad)
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            RETURNING id
+            RETURNING *
             ''', (usuario_id, curso_codigo, titulo, descripcion, tipo, fecha_limite, horas_estimadas, dificultad))
-            
-            tarea_id = cursor.fetchone()['id']
+
+            row = cursor.fetchone()
             conn.commit()
-            
-            return cls.obtener_por_id(tarea_id)
+
+            # RETURNING * ya trae la fila completa: no hace falta otro SELECT
+            return cls.from_row(row)
         except Exception as e:
             conn.rollback()
             raise e
@@ -493,35 +1018,43 @@ class Tarea(DatabaseModel):
             conn.close()
     
     @classmethod
-    def obtener_por_id(cls, tarea_id: int) -> Optional['Tarea']:
+    def obtener_por_id(cls, tarea_id: int, conn=None) -> Optional['Tarea']:
         """Obtiene una tarea por su identificador."""
-        conn = cls.get_connection()
+        conn_propia = conn is None
+        if conn_propia:
+            conn = cls.get_connection()
         cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM tareas WHERE id = %s', (tarea_id,))
+
+        cursor.execute('EXECUTE tarea_por_id(%s)', (tarea_id,))
         row = cursor.fetchone()
-        conn.close()
-        
+        if conn_propia:
+            conn.close()
+
         return cls.from_row(row) if row else None
-    
-    def marcar_completada(self, porcentaje: int = 100):
+
+    def marcar_completada(self, porcentaje: int = 100, conn=None):
         """Marca la tarea como completada y actualiza el porcentaje."""
-        conn = self.get_connection()
+        conn_propia = conn is None
+        if conn_propia:
+            conn = self.get_connection()
         cursor = conn.cursor()
-        
+
         cursor.execute(
             'UPDATE tareas SET completada = TRUE, porcentaje_completado = %s WHERE id = %s',
             (porcentaje, self.id)
         )
         conn.commit()
-        conn.close()
-        
+        if conn_propia:
+            conn.close()
+
         self.completada = True
         self.porcentaje_completado = porcentaje
-    
-    def actualizar_progreso(self, porcentaje: int):
+
+    def actualizar_progreso(self, porcentaje: int, conn=None):
         """Actualiza el porcentaje de completado de la tarea."""
-        conn = self.get_connection()
+        conn_propia = conn is None
+        if conn_propia:
+            conn = self.get_connection()
         cursor = conn.cursor()
 
         completada = porcentaje >= 100
@@ -530,19 +1063,23 @@ class Tarea(DatabaseModel):
             (porcentaje, completada, self.id)
         )
         conn.commit()
-        conn.close()
+        if conn_propia:
+            conn.close()
 
         self.porcentaje_completado = porcentaje
         self.completada = completada
-    
-    def eliminar(self):
+
+    def eliminar(self, conn=None):
         """Elimina la tarea de la base de datos."""
-        conn = self.get_connection()
+        conn_propia = conn is None
+        if conn_propia:
+            conn = self.get_connection()
         cursor = conn.cursor()
-        
+
         cursor.execute('DELETE FROM tareas WHERE id = %s', (self.id,))
         conn.commit()
-        conn.close()
+        if conn_propia:
+            conn.close()
     
     def dias_restantes(self) -> int:
         """Calcula cuantos dias faltan para la fecha limite."""
@@ -588,10 +1125,13 @@ class CalendarioInstitucional(DatabaseModel):
         conn = cls.get_connection()
         cursor = conn.cursor()
         
+        # make_interval recibe el parámetro como entero real (no
+        # interpolado dentro de un literal) y deja el predicado apto
+        # para índice sobre fecha_inicio
         cursor.execute('''
-        SELECT * FROM calendario_institucional 
-        WHERE fecha_inicio >= CURRENT_DATE 
-        AND fecha_inicio <= CURRENT_DATE + INTERVAL '%s days'
+        SELECT * FROM calendario_institucional
+        WHERE fecha_inicio >= CURRENT_DATE
+        AND fecha_inicio < CURRENT_DATE + make_interval(days => %s)
         ORDER BY fecha_inicio ASC
         ''', (dias,))
         
@@ -3,13 +3,27 @@ Usa programacion funcional (map, filter, reduce) para generar
 recomendaciones personalizadas de tareas basadas en multiples criterios.
 """
 
+import heapq
+from collections import defaultdict
 from datetime import datetime, timedelta
-from functools import reduce
-import operator
+from functools import lru_cache
+from itertools import filterfalse
+from operator import attrgetter, itemgetter
 from typing import Callable, Dict, List, Tuple
 
 # ========== FUNCIONES DE CALCULO (PROGRAMACION FUNCIONAL PURA) ==========
 
+# Bono por tipo de tarea, a nivel de modulo: el dict se construye una
+# sola vez y no en cada llamada dentro del bucle de puntuacion
+_BONUS_POR_TIPO = {
+    'parcial': 5.0,
+    'final': 5.0,
+    'proyecto': 3.0,
+    'taller': 1.0,
+    'exposicion': 2.0,
+    'lectura': 0.5
+}
+
 
 def calcular_urgencia(tarea, fecha_actual: datetime) -> float:
     """
@@ -77,24 +91,22 @@ def calcular_bonus_tipo(tarea) -> float:
     Returns:
         Bono asociado al tipo (puede ser 0).
     """
-    bonus_map = {
-        'parcial': 5.0,
-        'final': 5.0,
-        'proyecto': 3.0,
-        'taller': 1.0,
-        'exposicion': 2.0,
-        'lectura': 0.5
-    }
-    return bonus_map.get(tarea.tipo.lower(), 0)
+    return _BONUS_POR_TIPO.get(tarea.tipo.lower(), 0)
 
 
 # ========== FUNCION PRINCIPAL DE PUNTAJE ==========
 
 
+@lru_cache(maxsize=1024)
 def calcular_puntaje_prioridad(tarea, fecha_actual: datetime) -> float:
     """
     Calcula el puntaje total de prioridad de una tarea.
 
+    Memoizado por (tarea, fecha): el calculo es determinista y dentro
+    de un mismo ciclo (recomendaciones + plan de estudio + impresion)
+    la misma tarea se puntua varias veces con la misma fecha de
+    referencia propagada.
+
     Args:
         tarea: Objeto Tarea.
         fecha_actual: Fecha usada como referencia.
@@ -114,19 +126,19 @@ def calcular_puntaje_prioridad(tarea, fecha_actual: datetime) -> float:
 # ========== FUNCIONES DE ALTO ORDEN ==========
 
 
-def generar_recomendaciones(
+def generar_recomendaciones_con_puntaje(
     tareas: List,
     fecha_actual: datetime = None,
     limite: int = 5
-) -> List:
+) -> List[Tuple]:
     """
-    Genera recomendaciones usando programacion funcional.
+    Genera recomendaciones junto con su puntaje.
 
-    Pipeline:
-    1. Filter: Solo tareas pendientes.
-    2. Map: Calcular puntaje para cada tarea.
-    3. Sort: Ordenar por puntaje descendente.
-    4. Slice: Tomar las primeras N tareas.
+    El pipeline filter -> map -> sort -> slice esta fusionado en una
+    sola pasada: un generador filtra y puntua a la vez, y
+    heapq.nlargest extrae el top N en O(N log limite) sin ordenar ni
+    materializar listas intermedias. Devolver el puntaje evita que el
+    consumidor lo recalcule tarea por tarea.
 
     Args:
         tareas: Lista de objetos Tarea.
@@ -134,32 +146,45 @@ def generar_recomendaciones(
         limite: Numero maximo de recomendaciones.
 
     Returns:
-        Lista de tareas ordenadas por prioridad.
+        Lista de tuplas (tarea, puntaje) ordenadas por prioridad.
     """
     if fecha_actual is None:
         fecha_actual = datetime.now()
 
-    tareas_pendientes = list(filter(lambda t: not t.completada, tareas))
+    con_puntaje = (
+        (calcular_puntaje_prioridad(t, fecha_actual), t)
+        for t in tareas if not t.completada
+    )
 
-    tareas_con_puntaje = list(map(
-        lambda t: (t, calcular_puntaje_prioridad(t, fecha_actual)),
-        tareas_pendientes
-    ))
+    top = heapq.nlargest(limite, con_puntaje, key=itemgetter(0))
+    return [(tarea, puntaje) for puntaje, tarea in top]
 
-    tareas_ordenadas = sorted(
-        tareas_con_puntaje,
-        key=lambda x: x[1],
-        reverse=True
-    )
 
-    top_tareas = list(map(lambda x: x[0], tareas_ordenadas[:limite]))
+def generar_recomendaciones(
+    tareas: List,
+    fecha_actual: datetime = None,
+    limite: int = 5
+) -> List:
+    """
+    Genera recomendaciones (solo las tareas, sin puntaje).
 
-    return top_tareas
+    Args:
+        tareas: Lista de objetos Tarea.
+        fecha_actual: Fecha de referencia (default: ahora).
+        limite: Numero maximo de recomendaciones.
+
+    Returns:
+        Lista de tareas ordenadas por prioridad.
+    """
+    return [
+        tarea for tarea, _ in
+        generar_recomendaciones_con_puntaje(tareas, fecha_actual, limite)
+    ]
 
 
 def calcular_carga_semanal(tareas: List) -> Dict[str, float]:
     """
-    Calcula la carga semanal por materia usando reduce.
+    Calcula la carga semanal por materia en una sola pasada.
 
     Args:
         tareas: Lista de tareas pendientes.
@@ -167,88 +192,79 @@ def calcular_carga_semanal(tareas: List) -> Dict[str, float]:
     Returns:
         Diccionario {nombre_materia: total_horas}.
     """
-    tareas_pendientes = filter(lambda t: not t.completada, tareas)
-
-    def acumular_horas(acumulador: Dict, tarea) -> Dict:
-        materia = tarea.curso.nombre
-        acumulador[materia] = acumulador.get(materia, 0) + tarea.horas_estimadas
-        return acumulador
+    carga = defaultdict(float)
+    for tarea in tareas:
+        if not tarea.completada:
+            carga[tarea.curso.nombre] += tarea.horas_estimadas
 
-    carga = reduce(acumular_horas, tareas_pendientes, {})
-
-    return dict(sorted(carga.items(), key=lambda x: x[1], reverse=True))
+    return dict(sorted(carga.items(), key=itemgetter(1), reverse=True))
 
 
 def agrupar_tareas_por_tipo(tareas: List) -> Dict[str, List]:
     """
-    Agrupa tareas por tipo usando programacion funcional.
+    Agrupa tareas por tipo en una sola pasada.
 
     Returns:
         Diccionario {tipo: [lista_de_tareas]}.
     """
-    tipos_unicos = set(map(lambda t: t.tipo, tareas))
-
-    return {
-        tipo: list(filter(lambda t: t.tipo == tipo, tareas))
-        for tipo in tipos_unicos
-    }
+    grupos = defaultdict(list)
+    for tarea in tareas:
+        grupos[tarea.tipo].append(tarea)
+    return dict(grupos)
 
 
-def obtener_tareas_urgentes(tareas: List, dias_umbral: int = 3) -> List:
+def obtener_tareas_urgentes(tareas: List, dias_umbral: int = 3,
+                            fecha_actual: datetime = None) -> List:
     """
     Filtra tareas que vencen en los proximos N dias.
 
     Args:
         tareas: Lista de tareas.
         dias_umbral: Dias de anticipacion.
+        fecha_actual: Fecha de referencia (default: ahora).
 
     Returns:
         Lista de tareas urgentes.
     """
-    fecha_limite = datetime.now() + timedelta(days=dias_umbral)
+    if fecha_actual is None:
+        fecha_actual = datetime.now()
+    # Umbral calculado una sola vez fuera del bucle; la comparacion de
+    # datetimes es un rich-compare en C por tarea
+    fecha_limite = fecha_actual + timedelta(days=dias_umbral)
 
-    return list(filter(
-        lambda t: not t.completada and t.fecha_limite <= fecha_limite,
-        tareas
-    ))
+    return [
+        t for t in tareas
+        if not t.completada and t.fecha_limite <= fecha_limite
+    ]
 
 
 def calcular_estadisticas_funcionales(tareas: List) -> Dict:
     """
-    Calcula estadisticas usando solo programacion funcional.
+    Calcula estadisticas del listado de tareas en una sola pasada.
 
-    Usa map, filter y reduce para calcular el resumen de tareas.
+    Las cinco metricas (completadas, pendientes, horas, dificultad y la
+    tarea mas urgente) se acumulan en el mismo bucle: antes cada una
+    recorria la lista completa por su cuenta con filter/map/reduce.
     """
     total = len(tareas)
 
-    completadas = len(list(filter(lambda t: t.completada, tareas)))
-    pendientes = total - completadas
-
-    horas_pendientes = reduce(
-        operator.add,
-        map(lambda t: t.horas_estimadas,
-            filter(lambda t: not t.completada, tareas)),
-        0
-    )
+    completadas = 0
+    horas_pendientes = 0
+    suma_dificultad = 0
+    tarea_mas_urgente = None
 
-    if pendientes > 0:
-        suma_dificultad = reduce(
-            operator.add,
-            map(lambda t: t.dificultad,
-                filter(lambda t: not t.completada, tareas)),
-            0
-        )
-        dificultad_promedio = suma_dificultad / pendientes
-    else:
-        dificultad_promedio = 0
+    for tarea in tareas:
+        if tarea.completada:
+            completadas += 1
+            continue
+        horas_pendientes += tarea.horas_estimadas
+        suma_dificultad += tarea.dificultad
+        if (tarea_mas_urgente is None
+                or tarea.fecha_limite < tarea_mas_urgente.fecha_limite):
+            tarea_mas_urgente = tarea
 
-    tarea_mas_urgente = None
-    if pendientes > 0:
-        tareas_pendientes = list(filter(lambda t: not t.completada, tareas))
-        tarea_mas_urgente = min(
-            tareas_pendientes,
-            key=lambda t: t.fecha_limite
-        )
+    pendientes = total - completadas
+    dificultad_promedio = suma_dificultad / pendientes if pendientes else 0
 
     return {
         'total_tareas': total,
@@ -262,55 +278,52 @@ def calcular_estadisticas_funcionales(tareas: List) -> Dict:
 
 def generar_plan_estudio(
     tareas: List,
-    horas_disponibles_diarias: float = 4
+    horas_disponibles_diarias: float = 4,
+    fecha_actual: datetime = None,
+    limite: int = 10
 ) -> List[Dict]:
     """
     Genera un plan de estudio distribuyendo tareas en los proximos dias.
 
-    Esta funcion combina varias tecnicas funcionales:
-    - Filter para tareas pendientes.
-    - Map para calcular prioridades.
-    - Reduce para distribuir en dias.
+    El reparto usa first-fit: cada tarea, en orden de prioridad, cae en
+    el primer dia que aun tenga horas libres. El acumulador anterior
+    cerraba el dia al primer no-encaje y abandonaba la capacidad
+    restante, dejando huecos de horas sin usar.
 
     Args:
         tareas: Lista de todas las tareas.
         horas_disponibles_diarias: Horas disponibles por dia.
+        fecha_actual: Fecha de referencia (default: ahora).
+        limite: Cuantas tareas prioritarias repartir en el plan.
 
     Returns:
         Lista de diccionarios con el plan por dia.
     """
-    tareas_prioritarias = generar_recomendaciones(tareas, limite=10)
+    if fecha_actual is None:
+        fecha_actual = datetime.now()
 
-    plan = []
-    dia_actual = datetime.now()
-    horas_restantes_hoy = horas_disponibles_diarias
-    tareas_del_dia = []
+    tareas_prioritarias = generar_recomendaciones(tareas, fecha_actual,
+                                                  limite=limite)
 
+    # Cada dia guarda sus tareas y las horas ya ocupadas; una tarea va
+    # al primer dia con hueco suficiente y solo se abre dia nuevo si
+    # ninguno la admite (las que exceden la capacidad diaria ocupan un
+    # dia propio, como antes)
+    dias = []
     for tarea in tareas_prioritarias:
-        if tarea.horas_estimadas <= horas_restantes_hoy:
-            tareas_del_dia.append(tarea)
-            horas_restantes_hoy -= tarea.horas_estimadas
+        for dia in dias:
+            if dia['horas_totales'] + tarea.horas_estimadas <= horas_disponibles_diarias:
+                dia['tareas'].append(tarea)
+                dia['horas_totales'] += tarea.horas_estimadas
+                break
         else:
-            if tareas_del_dia:
-                plan.append({
-                    'fecha': dia_actual.date(),
-                    'tareas': tareas_del_dia,
-                    'horas_totales': horas_disponibles_diarias - horas_restantes_hoy
-                })
-
-            dia_actual += timedelta(days=1)
-            horas_restantes_hoy = horas_disponibles_diarias
-            tareas_del_dia = [tarea]
-            horas_restantes_hoy -= tarea.horas_estimadas
-
-    if tareas_del_dia:
-        plan.append({
-            'fecha': dia_actual.date(),
-            'tareas': tareas_del_dia,
-            'horas_totales': horas_disponibles_diarias - horas_restantes_hoy
-        })
+            dias.append({
+                'fecha': (fecha_actual + timedelta(days=len(dias))).date(),
+                'tareas': [tarea],
+                'horas_totales': tarea.horas_estimadas
+            })
 
-    return plan
+    return dias
 
 
 # ========== COMPOSICION DE FUNCIONES ==========
@@ -321,19 +334,28 @@ def compose(*functions: Callable) -> Callable:
     Compone multiples funciones en una sola.
 
     compose(f, g, h)(x) = f(g(h(x)))
+
+    Aplicacion iterativa en vez de closures anidados: una sola frame
+    extra por invocacion en lugar de n, y sin la identidad de base que
+    el reduce ejecutaba siempre.
     """
-    return reduce(lambda f, g: lambda x: f(g(x)), functions, lambda x: x)
+    def compuesta(x):
+        for funcion in reversed(functions):
+            x = funcion(x)
+        return x
+    return compuesta
 
 
-# Ejemplo de composicion
-filtrar_pendientes = lambda tareas: filter(lambda t: not t.completada, tareas)
-ordenar_por_fecha = lambda tareas: sorted(tareas, key=lambda t: t.fecha_limite)
-tomar_primeros_5 = lambda tareas: list(tareas)[:5]
+# Ejemplo de composicion: sorted consume el generador del filter
+# directamente y ya devuelve lista, asi que el recorte es un slice
+# sin copias intermedias
+filtrar_pendientes = lambda tareas: filterfalse(attrgetter('completada'), tareas)
+ordenar_por_fecha = lambda tareas: sorted(tareas, key=attrgetter('fecha_limite'))
+tomar_primeros_5 = lambda tareas: tareas[:5]
 
 obtener_proximas_5_pendientes = compose(
     tomar_primeros_5,
     ordenar_por_fecha,
-    list,
     filtrar_pendientes
 )
 
@@ -353,12 +375,15 @@ if __name__ == "__main__":
 
     tareas = usuario.obtener_tareas()
 
+    # Una sola marca de tiempo para toda la sesion de ejemplo
+    ahora = datetime.now()
+
     print("\nTOP 5 RECOMENDACIONES PARA HOY:")
     print("-" * 60)
-    recomendaciones = generar_recomendaciones(tareas, limite=5)
+    recomendaciones = generar_recomendaciones_con_puntaje(tareas, ahora,
+                                                          limite=5)
 
-    for i, tarea in enumerate(recomendaciones, 1):
-        puntaje = calcular_puntaje_prioridad(tarea, datetime.now())
+    for i, (tarea, puntaje) in enumerate(recomendaciones, 1):
         dias = tarea.dias_restantes()
         print(f"{i}. {tarea.titulo}")
         print(f"   Materia: {tarea.curso.nombre}")
@@ -385,7 +410,8 @@ if __name__ == "__main__":
 
     print("\nTAREAS URGENTES (proximos 3 dias):")
     print("-" * 60)
-    urgentes = obtener_tareas_urgentes(tareas, dias_umbral=3)
+    urgentes = obtener_tareas_urgentes(tareas, dias_umbral=3,
+                                       fecha_actual=ahora)
     if urgentes:
         for tarea in urgentes:
             print(f"* {tarea.titulo} ({tarea.curso.nombre})")
@@ -395,7 +421,8 @@ if __name__ == "__main__":
 
     print("\nPLAN DE ESTUDIO (4 horas/dia):")
     print("-" * 60)
-    plan = generar_plan_estudio(tareas, horas_disponibles_diarias=4)
+    plan = generar_plan_estudio(tareas, horas_disponibles_diarias=4,
+                                fecha_actual=ahora)
     for dia in plan[:3]:
         print(f"\n{dia['fecha']} ({dia['horas_totales']:.1f}h totales):")
         for tarea in dia['tareas']:
@@ -7,7 +7,25 @@ Incluye funciones reutilizables para validar datos de entrada y normalizar texto
 from datetime import datetime
 from functools import wraps
 import re
-from typing import Any, List, Optional, Tuple
+import string
+from typing import Any, Optional, Tuple
+
+# Import al cargar el modulo en lugar de en cada peticion; el modulo
+# sigue siendo usable sin Flask (p. ej. su bloque __main__) porque el
+# decorador es lo unico que lo necesita
+try:
+    from flask import g, jsonify, request
+except ImportError:
+    g = jsonify = request = None
+
+# Patrones compilados una sola vez al importar el modulo: los
+# validadores corren en cada peticion y asi se evita el lookup del
+# cache interno de re en cada llamada
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# "¿Contiene alguna letra?" no necesita el motor de regex: isdisjoint
+# itera la contrasena en C contra este frozenset
+_LETRAS_ASCII = frozenset(string.ascii_letters)
 
 # ========== VALIDACIONES DE FORMATO ==========
 
@@ -28,18 +46,20 @@ def validar_email(email: str) -> Tuple[bool, Optional[str]]:
         >>> validar_email("correo_invalido")
         (False, 'Formato de email invalido')
     """
-    if not isinstance(email, str) or not email.strip():
+    # Un solo strip: el resultado sirve tanto para el chequeo de vacio
+    # como para el resto de validaciones
+    email = email.strip() if isinstance(email, str) else ''
+    if not email:
         return False, "El email no puede estar vacio"
 
-    email = email.strip()
-    patron_email = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-
-    if not re.match(patron_email, email):
-        return False, "Formato de email invalido"
-
+    # Acotar longitud antes de correr el regex: una entrada enorme se
+    # rechaza en O(1) sin alimentar al motor de busqueda
     if len(email) > 255:
         return False, "Email demasiado largo (maximo 255 caracteres)"
 
+    if not _EMAIL_RE.match(email):
+        return False, "Formato de email invalido"
+
     return True, None
 
 
@@ -72,12 +92,40 @@ def validar_password(password: str) -> Tuple[bool, Optional[str]]:
     if len(password) > 128:
         return False, "La contrasena es demasiado larga (maximo 128 caracteres)"
 
-    if not re.search(r'[a-zA-Z]', password):
+    if _LETRAS_ASCII.isdisjoint(password):
         return False, "La contrasena debe contener al menos una letra"
 
     return True, None
 
 
+def _fecha_iso_valida(fecha_str: str) -> bool:
+    """
+    Camino rapido para fechas YYYY-MM-DD sin pasar por strptime.
+
+    strptime recompila el formato a regex y consulta tablas de locale
+    en cada llamada; aqui bastan los chequeos posicionales y el propio
+    constructor de datetime para validar mes y dia.
+    """
+    if len(fecha_str) != 10 or fecha_str[4] != '-' or fecha_str[7] != '-':
+        return False
+
+    # isascii primero: isdigit() acepta digitos Unicode (p. ej.
+    # arabigo-indios) que strptime rechaza; sin el guardia el camino
+    # rapido daria por valida una fecha que el camino lento no admite
+    if not fecha_str.isascii():
+        return False
+
+    anio, mes, dia = fecha_str[:4], fecha_str[5:7], fecha_str[8:10]
+    if not (anio.isdigit() and mes.isdigit() and dia.isdigit()):
+        return False
+
+    try:
+        datetime(int(anio), int(mes), int(dia))
+    except ValueError:
+        return False
+    return True
+
+
 def validar_fecha(fecha_str: str, formato: str = '%Y-%m-%d') -> Tuple[bool, Optional[str]]:
     """
     Valida el formato de una fecha.
@@ -95,9 +143,19 @@ def validar_fecha(fecha_str: str, formato: str = '%Y-%m-%d') -> Tuple[bool, Opti
         >>> validar_fecha("31/12/2025", "%d/%m/%Y")
         (True, None)
     """
-    if not isinstance(fecha_str, str) or not fecha_str.strip():
+    # Strip unico y sobre el valor que se valida: antes el original sin
+    # recortar llegaba a strptime y una fecha con espacios alrededor
+    # fallaba pese a pasar el chequeo de vacio
+    fecha_str = fecha_str.strip() if isinstance(fecha_str, str) else ''
+    if not fecha_str:
         return False, "La fecha no puede estar vacia"
 
+    # El formato por defecto cubre practicamente todas las llamadas; las
+    # formas no canonicas (p. ej. mes de un digito, que strptime tolera)
+    # caen al camino lento para conservar el comportamiento
+    if formato == '%Y-%m-%d' and _fecha_iso_valida(fecha_str):
+        return True, None
+
     try:
         datetime.strptime(fecha_str, formato)
         return True, None
@@ -184,7 +242,7 @@ def validar_longitud(
 
 def validar_opcion(
     valor: Any,
-    opciones_validas: List[Any],
+    opciones_validas: Any,
     nombre_campo: str = "valor"
 ) -> Tuple[bool, Optional[str]]:
     """
@@ -192,7 +250,8 @@ def validar_opcion(
 
     Args:
         valor: Valor a validar.
-        opciones_validas: Lista de valores permitidos.
+        opciones_validas: Coleccion de valores permitidos (idealmente
+            un frozenset, para membresia O(1)).
         nombre_campo: Nombre del campo.
 
     Returns:
@@ -203,14 +262,76 @@ def validar_opcion(
         (True, None)
     """
     if valor not in opciones_validas:
-        opciones_str = ", ".join(str(opcion) for opcion in opciones_validas)
+        # Orden estable para que el mensaje no dependa del contenedor
+        opciones_str = ", ".join(sorted(str(opcion) for opcion in opciones_validas))
         return False, f"{nombre_campo} debe ser uno de: {opciones_str}"
 
     return True, None
 
 
+def validar_opcion_rapida(
+    valor: Any,
+    opciones_validas: Any,
+    mensaje_error: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Variante de validar_opcion con el mensaje de error precomputado.
+
+    Para conjuntos de opciones fijos el mensaje es una constante; asi el
+    camino de fallo no ordena ni concatena strings en cada peticion.
+
+    Args:
+        valor: Valor a validar.
+        opciones_validas: Coleccion de valores permitidos.
+        mensaje_error: Mensaje a devolver si el valor no es valido.
+
+    Returns:
+        Tupla (es_valido, mensaje_error).
+    """
+    if valor not in opciones_validas:
+        return False, mensaje_error
+
+    return True, None
+
+
 # ========== VALIDACIONES COMPUESTAS ==========
 
+# Campos requeridos de cada validador compuesto, como tuplas de modulo:
+# antes se reconstruia la lista literal en cada peticion
+_CAMPOS_REGISTRO = (
+    'nombre',
+    'apellido',
+    'email',
+    'password',
+    'semestre_actual',
+    'tipo_estudio',
+)
+_CAMPOS_TAREA = ('curso_codigo', 'titulo', 'tipo', 'fecha_limite')
+
+# Versiones frozenset para detectar campos ausentes con una sola
+# diferencia de conjuntos en C; la tupla conserva el orden del mensaje
+_REQUERIDOS_REGISTRO = frozenset(_CAMPOS_REGISTRO)
+_REQUERIDOS_TAREA = frozenset(_CAMPOS_TAREA)
+
+# Opciones validas como frozenset (membresia O(1)); el mensaje con las
+# opciones solo se arma en el camino de error
+_TIPOS_ESTUDIO = frozenset({'intensivo', 'moderado', 'leve'})
+_TIPOS_TAREA = frozenset({
+    'parcial',
+    'final',
+    'proyecto',
+    'taller',
+    'exposicion',
+    'lectura',
+    'laboratorio',
+    'quiz',
+})
+
+# Mensajes de error precomputados para los conjuntos fijos: el camino
+# de fallo queda libre de construccion de strings por peticion
+_TIPOS_ESTUDIO_MSG = "tipo_estudio debe ser uno de: " + ", ".join(sorted(_TIPOS_ESTUDIO))
+_TIPOS_TAREA_MSG = "tipo debe ser uno de: " + ", ".join(sorted(_TIPOS_TAREA))
+
 
 def validar_datos_registro(data: dict) -> Tuple[bool, Optional[str]]:
     """
@@ -227,17 +348,9 @@ def validar_datos_registro(data: dict) -> Tuple[bool, Optional[str]]:
     if not isinstance(data, dict):
         return False, "Datos de registro invalidos"
 
-    campos_requeridos = [
-        'nombre',
-        'apellido',
-        'email',
-        'password',
-        'semestre_actual',
-        'tipo_estudio',
-    ]
-
-    for campo in campos_requeridos:
-        if campo not in data or not data[campo]:
+    faltantes = _REQUERIDOS_REGISTRO - data.keys()
+    for campo in _CAMPOS_REGISTRO:
+        if campo in faltantes or not data[campo]:
             return False, f"Campo requerido: {campo}"
 
     valido, error = validar_email(data['email'])
@@ -264,10 +377,10 @@ def validar_datos_registro(data: dict) -> Tuple[bool, Optional[str]]:
     except (ValueError, TypeError):
         return False, "semestre_actual debe ser un numero"
 
-    valido, error = validar_opcion(
+    valido, error = validar_opcion_rapida(
         data['tipo_estudio'],
-        ['intensivo', 'moderado', 'leve'],
-        'tipo_estudio'
+        _TIPOS_ESTUDIO,
+        _TIPOS_ESTUDIO_MSG
     )
     if not valido:
         return False, error
@@ -288,27 +401,16 @@ def validar_datos_tarea(data: dict) -> Tuple[bool, Optional[str]]:
     if not isinstance(data, dict):
         return False, "Datos de tarea invalidos"
 
-    campos_requeridos = ['curso_codigo', 'titulo', 'tipo', 'fecha_limite']
-
-    for campo in campos_requeridos:
-        if campo not in data or not data[campo]:
+    faltantes = _REQUERIDOS_TAREA - data.keys()
+    for campo in _CAMPOS_TAREA:
+        if campo in faltantes or not data[campo]:
             return False, f"Campo requerido: {campo}"
 
     valido, error = validar_longitud(data['titulo'], 3, 255, "titulo")
     if not valido:
         return False, error
 
-    tipos_validos = [
-        'parcial',
-        'final',
-        'proyecto',
-        'taller',
-        'exposicion',
-        'lectura',
-        'laboratorio',
-        'quiz',
-    ]
-    valido, error = validar_opcion(data['tipo'], tipos_validos, 'tipo')
+    valido, error = validar_opcion_rapida(data['tipo'], _TIPOS_TAREA, _TIPOS_TAREA_MSG)
     if not valido:
         return False, error
 
@@ -347,6 +449,11 @@ def validar_entrada(funcion_validacion):
     """
     Aplica validacion automatica a endpoints de Flask.
 
+    El payload ya parseado y validado queda en ``g.validated_data``: el
+    endpoint decorado debe leerlo de ahi en lugar de volver a llamar a
+    ``request.get_json()``, que repite el chequeo de Content-Type y el
+    lookup de cache en cada llamada.
+
     Args:
         funcion_validacion: Funcion que valida los datos de entrada.
 
@@ -358,9 +465,14 @@ def validar_entrada(funcion_validacion):
         @wraps(funcion)
         def wrapper(*args, **kwargs):
             """Valida el JSON de entrada antes de ejecutar el endpoint."""
-            from flask import jsonify, request
-
-            data = request.get_json()
+            if request is None:
+                raise RuntimeError(
+                    "validar_entrada requiere Flask y no esta instalado"
+                )
+
+            # silent=True evita la excepcion interna de Flask cuando el
+            # Content-Type no es JSON; el body se parsea una sola vez
+            data = request.get_json(cache=True, silent=True)
             if not data:
                 return jsonify({'error': 'No se recibieron datos'}), 400
 
@@ -368,6 +480,7 @@ def validar_entrada(funcion_validacion):
             if not es_valido:
                 return jsonify({'error': mensaje_error}), 400
 
+            g.validated_data = data
             return funcion(*args, **kwargs)
 
         return wrapper
@@ -376,6 +489,13 @@ def validar_entrada(funcion_validacion):
 
 # ========== SANITIZACION ==========
 
+# Tabla para borrar caracteres de control en una sola pasada C de
+# str.translate. Los controles de espacio (9-13 y 28-31: tab, \n, \r,
+# FS..US) se conservan: split() los trata como separadores y borrarlos
+# antes fusionaria palabras ("tab\tsep" -> "tabsep" en vez de "tab sep")
+_TABLA_CONTROL = {codigo: None for codigo in range(32) if not chr(codigo).isspace()}
+_TABLA_CONTROL[127] = None
+
 
 def sanitizar_texto(texto: str, max_length: int = 1000) -> str:
     """
@@ -399,8 +519,10 @@ def sanitizar_texto(texto: str, max_length: int = 1000) -> str:
 
     texto = str(texto)
     texto = texto[:max_length]
+    # translate elimina los caracteres de control en C; el split/join
+    # colapsa los espacios en la unica otra pasada
+    texto = texto.translate(_TABLA_CONTROL)
     texto = ' '.join(texto.split())
-    texto = ''.join(char for char in texto if ord(char) >= 32 or char == '\n')
 
     return texto.strip()
 